@@ -3,36 +3,51 @@ AskMyData REST API - FastAPI Upgrade
 Backend for the RAG Pipeline 
 """
 
-from fastapi import FastAPI,  HTTPException, Depends, UploadFile, File, status
+from fastapi import FastAPI,  HTTPException, Depends, UploadFile, File, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 
-from typing import Optional, Dict, List, Annotated
-from pydantic import BaseModel, EmailStr, ConfigDict, field_validator
+from typing import Optional, Dict, Iterator, List, Tuple, Annotated
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, StringConstraints
 
 # Password hashing - Passlib is FastAPI's standard
-from passlib.context import CryptContext
+import bcrypt
+from argon2 import PasswordHasher, Type as Argon2Type
+from argon2.exceptions import VerifyMismatchError
 
 # JWT authentication
-from jose import JWTError, jwt
-from fastapi import Cookie
+import jwt
+from fastapi import Cookie, Header
 from dotenv import load_dotenv 
 
 # File and system utilities
 from werkzeug.utils import secure_filename
+from werkzeug.security import check_password_hash
 import sqlite3
 import os
-from datetime import datetime, timedelta
-import traceback
+import asyncio
+import itertools
+import queue
+import hashlib
+import hmac
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from datetime import datetime
+import logging
+import time
 from contextlib import asynccontextmanager
+from functools import lru_cache
+from pathlib import Path
+from cachetools import TTLCache
 
+from db.pool import (configure_connection, init_pool, close_pool, get_conn,
+                     fetch_one, fetch_all, execute, run_in_conn)
 
-# RAG Pipeline imports 
-from parsers.file_parser import parse_file
-from rag.chunking_module import dataframe_to_chunks
-from rag.embeddings import EmbeddingGenerator
-from rag.vector_store import VectorStore
-from rag.query_processor import QueryProcessor
+# RAG pipeline modules (pandas, chromadb, ollama, ...) are imported lazily in
+# the getters / upload / ask paths so auth and health start serving immediately
 
 # ============================================
 # LIFESPAN EVENTS
@@ -45,6 +60,13 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     init_db()
+    if not os.getenv(INGEST_RECOVERY_ENV):
+        # Single process (dev server) - no other worker can own a pending row
+        fail_interrupted_ingests()
+    init_pool(DB_PATH, size=DB_POOL_SIZE)
+    chat_writer.start()
+    if RAG_WARMUP:
+        await run_in_threadpool(warm_rag_components)
     print("=" * 60)
     print("AskMyData REST API - FastAPI")
     print("=" * 60)
@@ -53,6 +75,14 @@ async def lifespan(app: FastAPI):
     print("=" * 60)
     yield
     # Shutdown (cleanup if needed)
+    chat_writer.stop()
+    password_executor.shutdown(wait=False)
+    # Running ingests finish while the pool can still record their result;
+    # queued ones are cancelled and marked failed instead of staying 'pending'
+    ingest_executor.shutdown(wait=True, cancel_futures=True)
+    if inflight_ingests:
+        fail_interrupted_ingests(file_ids=set(inflight_ingests))
+    close_pool()
     print("Shutting down...")
 
 # ============================================
@@ -65,16 +95,48 @@ app = FastAPI(
     version = '1.5.0',
     docs_url = '/docs', 
     redoc_url= '/redoc',
+    default_response_class=ORJSONResponse,  # orjson encodes straight to bytes
     lifespan=lifespan
 )
 
+# Logging - request paths log lazily through `logger`; set LOG_LEVEL=DEBUG to
+# see per-request pipeline steps
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "WARNING").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger("askmydata")
+
 #JWT Configuration (Flask has secert key and sessions)
 SECRET_KEY = "Vibhors_Secret_key_until_prod"   
 ALGORITHM =  "HS256"
+SECRET_KEY_BYTES = SECRET_KEY.encode()  # encoded once, not on every sign/verify
+# Only what our tokens carry is checked: signature, exp and sub (no aud/iss)
+JWT_DECODE_OPTIONS = {"verify_aud": False, "verify_iss": False, "require": ["exp", "sub"]}
 ACCESS_TOKEN_EXPIRE_MINUTES = 60*24 # user has to revalidate after 24 hours 
 
-# pasword hashing 
-pwd_context = CryptContext(schemes=['argon2'], deprecated = "auto")
+# pasword hashing - PASSWORD_HASH_SCHEME hashes new passwords, every other
+# known format is only verified and gets rehashed on next login
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "argon2")
+
+# Argon2id through argon2-cffi directly (no passlib dispatch per call), OWASP
+# "balanced" profile (19 MiB, 2 passes, 1 lane); hashes made with other
+# parameters are upgraded on the next successful login via check_needs_rehash()
+argon2_hasher = PasswordHasher(
+    time_cost = int(os.getenv("ARGON2_TIME_COST", "2")),
+    memory_cost = int(os.getenv("ARGON2_MEMORY_COST", "19456")),  # KiB
+    parallelism = int(os.getenv("ARGON2_PARALLELISM", "1")),
+    type = Argon2Type.ID
+)
+ARGON2_PREFIX = '$argon2'
+
+# bcrypt through the native bcrypt package (when PASSWORD_HASH_SCHEME=bcrypt,
+# or accounts hashed with it - including passlib-made $2b$ hashes)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # cost factor when bcrypt is the scheme
+BCRYPT_MAX_BYTES = 72  # bcrypt only uses the first 72 bytes (passlib truncated too)
+
+# Hashes written by werkzeug's generate_password_hash (Flask-era accounts)
+LEGACY_HASH_PREFIXES = ('pbkdf2:', 'scrypt:')
 
 
 # CORS Configuration 
@@ -91,35 +153,51 @@ app.add_middleware(
 )
 
 # Database and file paths
-DB_PATH = os.path.join(os.path.dirname(__file__), 'users.db')
-UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
-CHROMA_DB_PATH = os.path.join(os.path.dirname(__file__), 'rag', 'chroma_db')
+# (kept as str - they are stored in the db and handed to Chroma as-is)
+BASE_DIR = Path(__file__).resolve().parent
+DB_PATH = str(BASE_DIR / 'users.db')
+UPLOAD_FOLDER = str(BASE_DIR / 'uploads')
+CHROMA_DB_PATH = str(BASE_DIR / 'rag' / 'chroma_db')
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(CHROMA_DB_PATH, exist_ok=True)
 
 # Allowed file extensions 
-ALLOWED_EXTENSIONS = {'csv', 'json', 'pdf', 'ics'}
+ALLOWED_EXTENSIONS = {'csv', 'json', 'jsonl', 'ndjson', 'pdf', 'ics'}
+
+# Embedding model served by Ollama. Point this at a quantized tag (e.g. a q8_0
+# build) for faster CPU inference; uploads and queries must use the same model.
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
+# How long Ollama keeps the embedding model resident between calls
+EMBEDDING_KEEP_ALIVE = os.getenv("EMBEDDING_KEEP_ALIVE", "30m")
+# Chunks sent per embedding request during upload - capped by count and by
+# estimated tokens (MAX_BATCH is an alias of EMBED_BATCH_SIZE)
+EMBED_BATCH_SIZE = int(os.getenv("MAX_BATCH", os.getenv("EMBED_BATCH_SIZE", "32")))
+MAX_BATCH_TOKENS = int(os.getenv("MAX_BATCH_TOKENS", "16384"))
+# Embedding batch requests in flight at once (keep <= Ollama's OLLAMA_NUM_PARALLEL)
+INGEST_PARALLEL_THREADS = int(os.getenv("INGEST_PARALLEL_THREADS", "4"))
 
-# RAG components - initialized 
+# RAG components - initialized lazily (or by warm_rag_components at startup),
+# one per process: under gunicorn --preload they are created after the fork,
+# never in the master, so workers don't share Chroma/HTTP state
 embedding_generator = None
+embedding_batcher = None
 vector_store = None
+rag_init_lock = threading.Lock()
+# Build the RAG singletons (and load the embedding model in Ollama) at startup
+RAG_WARMUP = os.getenv("RAG_WARMUP", "1") == "1"
+
+# Identifier/text fields are whitespace-stripped by pydantic-core while decoding;
+# passwords are never stripped
+StrippedStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
 
 class UserRegister(BaseModel):
     """User registration request"""
-    fullname: str
-    username: str 
+    # Constraints are checked by pydantic-core while decoding, no Python validators
+    fullname: StrippedStr
+    username: StrippedStr
     email: EmailStr # Automatically validates email format 
-    password: str 
-
-    @field_validator('password')
-    @classmethod
-    def validate_password(cls, v: str) -> str:
-        """Validate password length"""
-        if len(v) < 6:
-            raise ValueError('Password must be at least 6 characters long')
-        if len(v) > 128:
-            raise ValueError('Password is too long (max 128 characters)')
-        return v
+    password: str = Field(min_length=6, max_length=128)
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -135,8 +213,8 @@ class UserRegister(BaseModel):
 
 class UserLogin(BaseModel):
     """Schema for login request"""
-    username: str
-    password: str
+    username: StrippedStr
+    password: str = Field(min_length=1, max_length=128)
 
 class UserResponse(BaseModel):
     """Schema for user data response"""
@@ -151,7 +229,7 @@ class Token(BaseModel):
 
 class QuestionRequest(BaseModel):
     """Schema for asking questions"""
-    question: str
+    question: StrippedStr
     file_id: Optional[int] = None  # Optional field with default None
     
     model_config = ConfigDict(
@@ -174,24 +252,180 @@ class FileResponse(BaseModel):
     num_chunks: int
     upload_date: str
 
+class LoginThrottle:
+    """
+    In-memory brute-force guard for /api/auth/login (per worker process)
+
+    - token bucket per client IP: `rate_per_minute` attempts, bursting to `burst`
+    - per-username lockout after `max_failures` bad passwords within `lockout_s`
+    Both are checked before the password hash is verified, so spraying
+    requests cannot make the server burn CPU on the KDF.
+    """
+
+    def __init__(self, rate_per_minute: float = 5, burst: int = 5,
+                 max_failures: int = 5, lockout_s: float = 300, max_entries: int = 10000):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_failures = max_failures
+        self.lockout_s = lockout_s
+        self.max_entries = max_entries
+        self._buckets = {}   # ip -> (tokens, last refill time)
+        self._failures = {}  # username -> (count, first failure time)
+        self._lock = threading.Lock()
+
+    def allow_ip(self, ip: str) -> bool:
+        """Take one token from the IP's bucket; False when it is empty"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(ip, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[ip] = (tokens, now)
+                return False
+            self._buckets[ip] = (tokens - 1, now)
+            if len(self._buckets) > self.max_entries:
+                # Full buckets carry no state worth keeping
+                full_after = self.burst / self.rate
+                self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < full_after}
+            return True
+
+    def is_locked(self, username: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._failures.get(username)
+            if entry is None:
+                return False
+            count, first = entry
+            if now - first >= self.lockout_s:
+                del self._failures[username]
+                return False
+            return count >= self.max_failures
+
+    def record_failure(self, username: str):
+        now = time.monotonic()
+        with self._lock:
+            count, first = self._failures.get(username, (0, now))
+            if now - first >= self.lockout_s:
+                count, first = 0, now
+            self._failures[username] = (count + 1, first)
+            if len(self._failures) > self.max_entries:
+                self._failures = {k: v for k, v in self._failures.items() if now - v[1] < self.lockout_s}
+
+    def record_success(self, username: str):
+        with self._lock:
+            self._failures.pop(username, None)
+
+login_throttle = LoginThrottle(
+    rate_per_minute=float(os.getenv("LOGIN_RATE_PER_MINUTE", 5)),
+    burst=int(os.getenv("LOGIN_RATE_BURST", 5)),
+    max_failures=int(os.getenv("LOGIN_MAX_FAILURES", 5)),
+    lockout_s=float(os.getenv("LOGIN_LOCKOUT_SECONDS", 300))
+)
+
+# username -> (password hash, fullname, email) for login and /api/auth/me
+# (which SPAs poll for auth state); unknown usernames are never cached
+USER_CACHE = TTLCache(maxsize=10_000, ttl=int(os.getenv("USER_CACHE_TTL", "300")))
+USER_CACHE_LOCK = threading.RLock()
+
+def invalidate_user_cache(username: str):
+    """Drop a cached user - call whenever a users row is inserted or updated"""
+    with USER_CACHE_LOCK:
+        USER_CACHE.pop(username, None)
+
+async def get_user_record(username: str) -> Optional[tuple]:
+    """(password hash, fullname, email) for a user, from USER_CACHE or the DB; None if unknown"""
+    with USER_CACHE_LOCK:
+        record = USER_CACHE.get(username)
+    if record is None:
+        row = await fetch_one(SQL_SELECT_LOGIN, (username,))
+        if row is None:
+            return None
+        record = tuple(row)
+        with USER_CACHE_LOCK:
+            USER_CACHE[username] = record
+    return record
+
+# Password KDF work runs on its own small pool (sized to the CPUs) so a burst
+# of logins can't take every thread from the default pool that serves SQLite
+password_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2)),
+    thread_name_prefix="password-hash"
+)
+
+async def run_password_job(fn, *args):
+    """Run a hashing/verification function on password_executor without blocking the loop"""
+    return await asyncio.get_running_loop().run_in_executor(password_executor, fn, *args)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain password against its hash
     Replaces: check_password_hash(hashed, plain)
     """
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        if hashed_password.startswith(ARGON2_PREFIX):
+            try:
+                return argon2_hasher.verify(hashed_password, plain_password)
+            except VerifyMismatchError:
+                return False
+        if hashed_password.startswith(LEGACY_HASH_PREFIXES):
+            return check_password_hash(hashed_password, plain_password)
+        return bcrypt.checkpw(plain_password.encode()[:BCRYPT_MAX_BYTES], hashed_password.encode())
     except Exception as e:
         # Hash format not recognized (likely old hash from previous version)
-        print(f"Password verification error: {e}")
+        logger.warning("Password verification error: %s", e)
         return False
 
 def get_password_hash(password: str) -> str:
     """
-    Hash a password using argon2
+    Hash a password using PASSWORD_HASH_SCHEME (argon2 by default)
     Replaces: generate_password_hash(password)
     """
-    return pwd_context.hash(password)
+    if PASSWORD_HASH_SCHEME == 'argon2':
+        return argon2_hasher.hash(password)
+    return bcrypt.hashpw(password.encode()[:BCRYPT_MAX_BYTES], bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check if a stored hash is legacy or uses outdated scheme/parameters"""
+    if hashed_password.startswith(LEGACY_HASH_PREFIXES):
+        return True
+    is_argon2 = hashed_password.startswith(ARGON2_PREFIX)
+    if is_argon2 != (PASSWORD_HASH_SCHEME == 'argon2'):
+        return True  # stored with the other scheme
+    if is_argon2:
+        return argon2_hasher.check_needs_rehash(hashed_password)
+    # $2b$<rounds>$<salt+hash> - rehash when the cost factor changed
+    try:
+        return int(hashed_password.split('$')[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+# Verified against when the username doesn't exist, so an unknown user takes
+# as long to reject as a wrong password (no user-enumeration timing signal)
+DUMMY_PASSWORD_HASH = get_password_hash(secrets.token_urlsafe(16))
+
+# Recent successful logins: (username, stored hash, keyed digest of the password).
+# A repeat login within the TTL skips the KDF; a changed hash never matches and
+# failures are never cached. The HMAC key is per process, so the digests are
+# useless outside it.
+LOGIN_CACHE = TTLCache(maxsize=1024, ttl=int(os.getenv("LOGIN_CACHE_TTL", "60")))
+LOGIN_CACHE_LOCK = threading.Lock()
+_LOGIN_CACHE_KEY = secrets.token_bytes(32)
+
+def login_cache_key(username: str, password: str, hashed_password: str) -> tuple:
+    digest = hmac.new(_LOGIN_CACHE_KEY, password.encode(), hashlib.sha256).digest()
+    return (username, hashed_password, digest)
+
+def verify_login_password(username: str, password: str, hashed_password: str) -> bool:
+    """verify_password() that remembers successes in LOGIN_CACHE"""
+    key = login_cache_key(username, password, hashed_password)
+    with LOGIN_CACHE_LOCK:
+        if key in LOGIN_CACHE:
+            return True
+    if not verify_password(password, hashed_password):
+        return False
+    with LOGIN_CACHE_LOCK:
+        LOGIN_CACHE[key] = True
+    return True
 
 def create_access_token(data: dict) -> str:
     """
@@ -202,27 +436,73 @@ def create_access_token(data: dict) -> str:
     - FastAPI: Create JWT token with username inside
     """
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    # exp as plain epoch seconds - no datetime round-trip
+    to_encode["exp"] = int(time.time()) + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY_BYTES, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Tokens revoked by logout - kept for the token lifetime so they can't be replayed
+REVOKED_TOKENS = TTLCache(maxsize=100_000, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+REVOKED_TOKENS_LOCK = threading.Lock()
+
+@lru_cache(maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "4096")))
+def _decode(token: str) -> Tuple[Optional[str], Optional[int]]:
+    """
+    (username, exp) from a token, or (None, None) if it doesn't verify
+
+    A token never changes, so its signature is checked once and later
+    requests hit the cache; exp is re-checked by verify_token on every call
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY_BYTES, algorithms=[ALGORITHM], options=JWT_DECODE_OPTIONS)
+    except jwt.PyJWTError:
+        return None, None
+    return payload.get("sub"), payload.get("exp")  # 'sub' is standard JWT claim for subject
+
 def verify_token(token: str) -> Optional[str]:
     """
     Verify JWT token and extract username
     
-    Returns username if valid, None if invalid/expired
+    Returns username if valid, None if invalid/expired/revoked
     """
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")  # 'sub' is standard JWT claim for subject
-        return username
-    except JWTError:
+    with REVOKED_TOKENS_LOCK:
+        if token in REVOKED_TOKENS:
+            return None
+    username, exp = _decode(token)
+    if exp is not None and exp <= time.time():
         return None
+    return username
+
+def revoke_token(token: str):
+    """Reject a token from now on (logout)"""
+    with REVOKED_TOKENS_LOCK:
+        REVOKED_TOKENS[token] = True
+
+# The auth cookie is only sent to /api/* - the docs pages and / never need it,
+# so the browser doesn't attach the token to those requests
+AUTH_COOKIE_PATH = "/api"
+
+def set_auth_cookie(response: Response, access_token: str):
+    """Store the JWT in the httponly access_token cookie"""
+    response.set_cookie(
+        key="access_token",
+        value=access_token,
+        httponly=True,
+        max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        samesite="lax",
+        path=AUTH_COOKIE_PATH
+    )
+
+def request_token(access_token: Optional[str], authorization: Optional[str]) -> Optional[str]:
+    """Raw token from the access_token cookie or an `Authorization: Bearer` header"""
+    if not access_token and authorization and authorization[:7].lower() == "bearer ":
+        return authorization[7:]
+    return access_token
 
 # Authentication dependency 
 async def get_current_user(
-    access_token: Annotated[Optional[str], Cookie()] = None
+    access_token: Annotated[Optional[str], Cookie()] = None,
+    authorization: Annotated[Optional[str], Header()] = None
 ) -> str:
     """
     Dependency function that extracts and validates the user from JWT cookie
@@ -239,7 +519,12 @@ async def get_current_user(
         @app.get('/protected')
         async def protected(username: str = Depends(get_current_user)):
             # username is automatically extracted
+    
+    Accepts the token from the access_token cookie (browser) or an
+    `Authorization: Bearer <token>` header (API clients, no cookie jar needed).
     """
+    access_token = request_token(access_token, authorization)
+    
     # Check if token exists
     if not access_token:
         raise HTTPException(
@@ -263,30 +548,245 @@ def get_embedding_generator():
     """Lazy initialization of embedding generator"""
     global embedding_generator
     if embedding_generator is None:
-        print("Initializing embedding generator...")
-        embedding_generator = EmbeddingGenerator()
+        with rag_init_lock:
+            if embedding_generator is None:
+                print("Initializing embedding generator...")
+                from rag.embeddings import EmbeddingGenerator
+                embedding_generator = EmbeddingGenerator(
+                    model_name=EMBEDDING_MODEL,
+                    keep_alive=EMBEDDING_KEEP_ALIVE
+                )
     return embedding_generator
 
+def get_embedding_batcher():
+    """Lazy initialization of the query embedding micro-batcher"""
+    global embedding_batcher
+    if embedding_batcher is None:
+        embedder = get_embedding_generator()
+        with rag_init_lock:
+            if embedding_batcher is None:
+                from rag.embeddings import EmbeddingBatcher
+                embedding_batcher = EmbeddingBatcher(
+                    embedder,
+                    max_batch_size=int(os.getenv("QUERY_EMBED_BATCH_SIZE", "8")),
+                    max_wait_ms=float(os.getenv("QUERY_EMBED_WAIT_MS", "10")),
+                    cache_size=int(os.getenv("QUERY_EMBED_CACHE_SIZE", "1024"))
+                )
+    return embedding_batcher
+
 def get_vector_store():
     """Lazy initialization of vector store """
     global vector_store
     if vector_store is None:
-        print("Initializing vector store...")
-        vector_store = VectorStore(persist_directory=CHROMA_DB_PATH)
+        with rag_init_lock:
+            if vector_store is None:
+                print("Initializing vector store...")
+                from rag.vector_store import VectorStore
+                vector_store = VectorStore(persist_directory=CHROMA_DB_PATH)
     return vector_store
 
-def allowed_file(filename: str) -> bool:
-    """Check if file extension is allowed """
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+def warm_rag_components():
+    """Create the RAG singletons and load the embedding model so the first upload/ask doesn't pay for it"""
+    try:
+        get_embedding_generator().embed_many(["warmup"])
+        get_embedding_batcher()
+        get_vector_store()
+    except Exception as e:
+        # Ollama/Chroma not up yet - components are still created lazily later
+        logger.warning("RAG warmup failed: %s", e)
+
+# One QueryProcessor per collection (LRU-bounded) instead of one per question;
+# process_query keeps no per-call state, so instances are shared across threads
+QUERY_PROCESSOR_CACHE_SIZE = int(os.getenv("QUERY_PROCESSOR_CACHE_SIZE", "256"))
+query_processors = OrderedDict()
+query_processors_lock = threading.Lock()
+
+def get_query_processor(collection_name: str):
+    """Return the cached QueryProcessor for a collection, building it on first use"""
+    with query_processors_lock:
+        processor = query_processors.get(collection_name)
+        if processor is not None:
+            query_processors.move_to_end(collection_name)
+            return processor
+    
+    # Build outside the lock - construction talks to Chroma and the LLM.
+    # The embedder and the Chroma client are the app-wide singletons, so a new
+    # collection only costs a get_or_create_collection() call
+    from rag.query_processor import QueryProcessor
+    processor = QueryProcessor(
+        collection_name=collection_name,
+        embedding_model=EMBEDDING_MODEL,
+        llm_model='llama3.2',
+        chroma_persist_dir=CHROMA_DB_PATH,
+        embedder=get_embedding_generator(),
+        chroma_client=get_vector_store().client
+    )
+    with query_processors_lock:
+        processor = query_processors.setdefault(collection_name, processor)
+        while len(query_processors) > QUERY_PROCESSOR_CACHE_SIZE:
+            query_processors.popitem(last=False)
+    return processor
+
+def invalidate_query_processor(collection_name: str):
+    """Drop a cached QueryProcessor (e.g. once its user has no files left)"""
+    with query_processors_lock:
+        query_processors.pop(collection_name, None)
+
+UPLOAD_COPY_BUFSIZE = 1024 * 1024
+
+def save_upload(src, file_path: str) -> Tuple[int, str]:
+    """
+    Copy an uploaded file object to file_path in UPLOAD_COPY_BUFSIZE blocks
+
+    Returns (size in bytes, sha256 hex digest) - both taken in the same pass,
+    so the saved file is never read back
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, 'wb') as out:
+        while block := src.read(UPLOAD_COPY_BUFSIZE):
+            digest.update(block)
+            out.write(block)
+            size += len(block)
+    return size, digest.hexdigest()
 
 # Database setup 
 
-def init_db():
-    """ Initialize SQLite db tables"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+def db_timestamp(now: Optional[datetime] = None) -> str:
+    """Local time as 'YYYY-MM-DD HH:MM:SS', the format stored in upload_date/timestamp"""
+    # isoformat() is C-level formatting; same text as strftime('%Y-%m-%d %H:%M:%S')
+    return (now or datetime.now()).isoformat(sep=' ', timespec='seconds')
+
+# Hot queries as module-level constants; pooled connections keep them
+# prepared in sqlite3's statement cache
+SQL_INSERT_USER = "INSERT INTO users (fullname, username, email, password) VALUES (?, ?, ?, ?)"
+SQL_SELECT_LOGIN = "SELECT password, fullname, email FROM users WHERE username = ?"
+SQL_UPDATE_PASSWORD = "UPDATE users SET password = ? WHERE username = ?"
+SQL_INSERT_FILE = """INSERT INTO files 
+       (username, filename, original_filename, file_type, file_path, 
+        upload_date, collection_name, content_hash, file_size, status) 
+       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending')"""
+SQL_FILE_READY = """UPDATE files SET status = 'ready', num_rows = ?, num_columns = ?, num_chunks = ?
+   WHERE file_id = ?"""
+SQL_FILE_FAILED = "UPDATE files SET status = 'failed' WHERE file_id = ?"
+SQL_PENDING_FILES = "SELECT file_id, file_path FROM files WHERE status = 'pending'"
+SQL_FILE_BY_HASH = """SELECT file_id, filename, original_filename, file_type, status, upload_date
+   FROM files WHERE username = ? AND content_hash = ? AND status != 'failed'
+   ORDER BY file_id DESC LIMIT 1"""
+SQL_LIST_FILES = """SELECT file_id, filename, original_filename, file_type, 
+          upload_date, num_rows, num_columns, collection_name,
+          COALESCE(num_chunks, num_rows) AS num_chunks, status,
+          COALESCE(file_size, 0) AS file_size
+   FROM files WHERE username = ? 
+   ORDER BY upload_date DESC"""
+SQL_GET_FILE = """SELECT file_id, filename, original_filename, file_type, 
+          upload_date, num_rows, num_columns, file_path, status,
+          COALESCE(num_chunks, num_rows) AS num_chunks
+   FROM files WHERE file_id = ? AND username = ?"""
+SQL_DELETE_FILE = """DELETE FROM files WHERE file_id = ? AND username = ?
+   RETURNING file_path, filename, collection_name"""
+SQL_DELETE_FILE_CHATS = "DELETE FROM chat_history WHERE file_id = ?"
+SQL_HAS_FILES = "SELECT 1 FROM files WHERE username = ? LIMIT 1"
+# The requested file, or the most recent one when file_id is NULL
+# Two statements rather than one "(? IS NULL OR file_id = ?)" query: SQLite
+# plans that OR once for both cases and walks all of the user's files even
+# when a file_id is given, where a rowid lookup is enough
+SQL_ASK_FILENAME_BY_ID = """SELECT original_filename FROM files
+   WHERE file_id = ? AND username = ? AND status = 'ready'"""
+SQL_ASK_LATEST_FILENAME = """SELECT original_filename FROM files
+   WHERE username = ? AND status = 'ready'
+   ORDER BY upload_date DESC LIMIT 1"""
+SQL_INSERT_CHAT = """INSERT INTO chat_history (username, file_id, question, answer, timestamp)
+       VALUES (?, ?, ?, ?, ?)"""
+# History pages are listed in Python from the ordered rows: SQLite only
+# guarantees json_group_array's order with ORDER BY inside the aggregate,
+# which needs SQLite 3.44+
+SQL_CHAT_HISTORY = """SELECT id, question, answer, timestamp, file_id 
+   FROM chat_history WHERE username = ? 
+   ORDER BY timestamp DESC, id DESC 
+   LIMIT ? OFFSET ?"""
+# Keyset page: rows older than the last (timestamp, id) the client has seen;
+# an index range scan on idx_chat_history_user instead of skipping OFFSET rows
+SQL_CHAT_HISTORY_BEFORE = """SELECT id, question, answer, timestamp, file_id 
+   FROM chat_history WHERE username = ? 
+     AND (timestamp < ? OR (timestamp = ? AND id < ?))
+   ORDER BY timestamp DESC, id DESC 
+   LIMIT ?"""
+
+class ChatWriter:
+    """
+    Background writer for chat_history rows
+
+    Rows from concurrent /api/ask calls are queued and flushed together with
+    executemany() in a single transaction - one commit per batch instead of
+    one per question. submit() returns immediately; the answer never waits
+    for its history row.
+    """
+
+    def __init__(self, max_batch: int = 200, max_wait_ms: float = 100):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="chat-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Flush everything queued so far and stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
 
-    # Users table 
+    def submit(self, row: tuple):
+        """Queue (username, file_id, question, answer, timestamp) for insertion"""
+        self.start()
+        self._queue.put(row)
+
+    def _collect_batch(self):
+        """Block for the first row, then drain until max_batch or max_wait; None = stop"""
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect_batch()
+            if not batch:
+                continue
+            try:
+                with get_conn(write=True) as conn, conn:
+                    conn.executemany(SQL_INSERT_CHAT, batch)
+            except Exception as e:
+                logger.exception("Failed to save %d chat history rows: %s", len(batch), e)
+
+chat_writer = ChatWriter()
+
+# Bump when init_db() gains a migration step (stored in PRAGMA user_version)
+SCHEMA_VERSION = 5
+
+def _schema_v1(c: sqlite3.Cursor):
+    # Users table - the username PRIMARY KEY is backed by SQLite's implicit
+    # unique index (sqlite_autoindex_users_1), which serves the login/me
+    # lookups and the duplicate check on register; no extra index needed
     c.execute('''CREATE TABLE IF NOT EXISTS users (
               username TEXT PRIMARY KEY, 
               fullname TEXT NOT NULL, 
@@ -294,7 +794,7 @@ def init_db():
               password TEXT NOT NULL, 
               created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )''')
-    
+
     # Files table
     c.execute('''CREATE TABLE IF NOT EXISTS files (
         file_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -309,7 +809,7 @@ def init_db():
         collection_name TEXT,
         FOREIGN KEY (username) REFERENCES users(username)
     )''')
-    
+
     # Chat history table
     c.execute('''CREATE TABLE IF NOT EXISTS chat_history (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -322,9 +822,82 @@ def init_db():
         FOREIGN KEY (file_id) REFERENCES files(file_id)
     )''')
 
-    conn.commit()
-    conn.close()
-    print("✓ Database initialized")
+    # Indexes for the per-user listings (index-ordered scans, no in-memory sort)
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_files_user
+                 ON files(username, upload_date DESC)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_chat_history_user
+                 ON chat_history(username, timestamp DESC)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_chat_history_file
+                 ON chat_history(file_id)''')
+
+    # Refresh planner statistics so the new indexes get picked
+    c.execute("ANALYZE")
+
+def _schema_v2(c: sqlite3.Cursor):
+    # Chunk count stored at upload (NULL for files uploaded before v2)
+    c.execute("ALTER TABLE files ADD COLUMN num_chunks INTEGER")
+
+def _schema_v3(c: sqlite3.Cursor):
+    # Ingest state: pending -> ready | failed (older rows were processed inline)
+    c.execute("ALTER TABLE files ADD COLUMN status TEXT NOT NULL DEFAULT 'ready'")
+
+def _schema_v4(c: sqlite3.Cursor):
+    # sha256 of the upload, taken while saving it (NULL for older rows) -
+    # lets duplicates of a user's file be found without re-reading files
+    c.execute("ALTER TABLE files ADD COLUMN content_hash TEXT")
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_files_user_hash
+                 ON files(username, content_hash)''')
+
+def _schema_v5(c: sqlite3.Cursor):
+    # Upload size in bytes, recorded by save_upload(); existing rows are
+    # stat'ed once here instead of on every GET /api/files
+    c.execute("ALTER TABLE files ADD COLUMN file_size INTEGER")
+    sizes = []
+    for file_id, file_path in c.execute("SELECT file_id, file_path FROM files").fetchall():
+        try:
+            sizes.append((os.stat(file_path).st_size, file_id))
+        except (OSError, TypeError):
+            pass  # missing file - listed as 0 bytes
+    c.executemany("UPDATE files SET file_size = ? WHERE file_id = ?", sizes)
+
+# Migration step that brings the schema to each version, in order
+SCHEMA_STEPS = [(1, _schema_v1), (2, _schema_v2), (3, _schema_v3), (4, _schema_v4), (5, _schema_v5)]
+
+# How long a worker waits for another one that is running the migrations
+SCHEMA_LOCK_TIMEOUT_MS = 60_000
+
+def init_db(db_path: Optional[str] = None):
+    """
+    Initialize SQLite db tables (no-op once the schema is at SCHEMA_VERSION)
+
+    Safe to run from several worker processes at once: every step runs in its
+    own BEGIN IMMEDIATE transaction (one writer at a time), re-reads
+    user_version once it holds the lock and bumps it in the same commit. A
+    worker that lost the race skips the steps already applied, and a crash
+    mid-step rolls that step back (SQLite DDL is transactional) instead of
+    leaving a half-migrated schema behind.
+    """
+    conn = configure_connection(sqlite3.connect(db_path or DB_PATH, isolation_level=None))
+    try:
+        conn.execute(f"PRAGMA busy_timeout={SCHEMA_LOCK_TIMEOUT_MS}")
+        c = conn.cursor()
+
+        if c.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+
+        for target, step in SCHEMA_STEPS:
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                if c.execute("PRAGMA user_version").fetchone()[0] < target:
+                    step(c)
+                    c.execute(f"PRAGMA user_version = {target}")
+                c.execute("COMMIT")
+            except BaseException:
+                c.execute("ROLLBACK")
+                raise
+    finally:
+        conn.close()
+    print(f"✓ Database initialized (schema v{SCHEMA_VERSION})")
 
 # ============================================
 # ROOT & HEALTH CHECK ENDPOINTS
@@ -357,19 +930,30 @@ async def home():
             },
             "query": {
                 "ask": "/api/ask (POST)",
+                "ask_stream": "/api/ask/stream (POST)",
                 "history": "/api/ask/history (GET)"
             }
         }
     }
 
+# Health body is pre-encoded and rebuilt at most once per second, so
+# frequent liveness probes don't build a datetime + JSON on every hit
+_health_second = None
+_health_body = b""
+
 @app.get("/api/health", tags=["health"])
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "ok",
-        "message": "AskMyData API is running",
-        "timestamp": datetime.now().isoformat()
-    }
+    global _health_second, _health_body
+    now = int(time.time())
+    if now != _health_second:
+        _health_body = (
+            b'{"status":"ok","message":"AskMyData API is running","timestamp":"'
+            + datetime.fromtimestamp(now).isoformat().encode()
+            + b'"}'
+        )
+        _health_second = now
+    return Response(_health_body, media_type="application/json")
 
 # ============================================
 # AUTHENTICATION ENDPOINTS
@@ -379,24 +963,21 @@ async def health_check():
 async def register(user: UserRegister):
     """Register new user"""
     # Hash password
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await run_password_job(get_password_hash, user.password)
     
     # Insert into database
     try:
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute(
-            "INSERT INTO users (fullname, username, email, password) VALUES (?, ?, ?, ?)",
+        await execute(
+            SQL_INSERT_USER,
             (user.fullname, user.username, user.email, hashed_password)
         )
-        conn.commit()
-        conn.close()
+        invalidate_user_cache(user.username)
         
         # Create JWT token
         access_token = create_access_token(data={"sub": user.username})
         
         # Create response with token as cookie
-        response = JSONResponse(
+        response = ORJSONResponse(
             status_code=status.HTTP_201_CREATED,
             content={
                 "success": True,
@@ -405,16 +986,12 @@ async def register(user: UserRegister):
                     "username": user.username,
                     "fullname": user.fullname,
                     "email": user.email
-                }
+                },
+                "access_token": access_token,
+                "token_type": "bearer"
             }
         )
-        response.set_cookie(
-            key="access_token",
-            value=access_token,
-            httponly=True,
-            max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-            samesite="lax"
-        )
+        set_auth_cookie(response, access_token)
         
         return response
         
@@ -425,36 +1002,53 @@ async def register(user: UserRegister):
         )
 
 @app.post("/api/auth/login", response_model=Dict, tags=["auth"])
-async def login(user: UserLogin):
+async def login(user: UserLogin, request: Request):
     """Login user"""
-    # Query database
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "SELECT password, fullname, email FROM users WHERE username = ?",
-        (user.username,)
-    )
-    row = c.fetchone()
-    conn.close()
+    # Reject throttled clients / locked accounts before any hashing work
+    client_ip = request.client.host if request.client else "unknown"
+    if not login_throttle.allow_ip(client_ip) or login_throttle.is_locked(user.username):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": "60"}
+        )
+    
+    # Cached user record (DB on a miss)
+    row = await get_user_record(user.username)
     
     # Check credentials
     if row is None:
+        # Same KDF work as a real check before rejecting
+        await run_password_job(verify_password, user.password, DUMMY_PASSWORD_HASH)
+        login_throttle.record_failure(user.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password"
         )
     
-    if not verify_password(user.password, row[0]):
+    if not await run_password_job(verify_login_password, user.username, user.password, row[0]):
+        login_throttle.record_failure(user.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid username or password. If you registered before the migration, please register again."
+            detail="Invalid username or password"
         )
     
+    login_throttle.record_success(user.username)
+    
+    # Upgrade legacy/outdated hashes while we have the plain password
+    if password_needs_rehash(row[0]):
+        new_hash = await run_password_job(get_password_hash, user.password)
+        await execute(
+            SQL_UPDATE_PASSWORD,
+            (new_hash, user.username)
+        )
+        invalidate_user_cache(user.username)
+    
     # Create JWT token
     access_token = create_access_token(data={"sub": user.username})
     
     # Create response with token as cookie
-    response = JSONResponse(
+    response = ORJSONResponse(
         content={
             "success": True,
             "message": "Logged in successfully",
@@ -462,50 +1056,45 @@ async def login(user: UserLogin):
                 "username": user.username,
                 "fullname": row[1],
                 "email": row[2]
-            }
+            },
+            "access_token": access_token,
+            "token_type": "bearer"
         }
     )
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        samesite="lax"
-    )
+    set_auth_cookie(response, access_token)
     
     return response
 
 @app.post("/api/auth/logout", tags=["auth"])
-async def logout(username: str = Depends(get_current_user)):
-    """Logout current user"""
-    response = JSONResponse(
+async def logout(
+    username: str = Depends(get_current_user),
+    access_token: Annotated[Optional[str], Cookie()] = None,
+    authorization: Annotated[Optional[str], Header()] = None
+):
+    """Logout current user (the token stops working, not just the cookie)"""
+    revoke_token(request_token(access_token, authorization))
+    response = ORJSONResponse(
         content={
             "success": True,
             "message": "Logged out successfully"
         }
     )
-    response.delete_cookie(key="access_token")
+    response.delete_cookie(key="access_token", path=AUTH_COOKIE_PATH)
+    response.delete_cookie(key="access_token")  # cookies issued before the path was narrowed
     return response
 
 @app.get("/api/auth/me", tags=["auth"])
 async def get_current_user_info(username: str = Depends(get_current_user)):
     """Get current logged-in user information"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "SELECT fullname, email FROM users WHERE username = ?",
-        (username,)
-    )
-    row = c.fetchone()
-    conn.close()
+    row = await get_user_record(username)
     
     if row:
         return {
             "authenticated": True,
             "user": {
                 "username": username,
-                "fullname": row[0],
-                "email": row[1]
+                "fullname": row[1],
+                "email": row[2]
             }
         }
     
@@ -518,12 +1107,183 @@ async def get_current_user_info(username: str = Depends(get_current_user)):
 # FILE MANAGEMENT ENDPOINTS
 # ============================================
 
-@app.post("/api/files/upload", status_code=status.HTTP_201_CREATED, tags=["files"])
+# Ingest (parse/chunk/embed/store) runs on its own bounded pool: a few large
+# uploads can't take the threadpool that serves requests, and extra uploads
+# simply queue as 'pending'
+ingest_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("INGEST_WORKERS", "2")),
+    thread_name_prefix="ingest"
+)
+
+# file_ids submitted to this process' ingest_executor and not finished yet
+inflight_ingests = set()
+
+# Set by a supervisor (gunicorn master / uvicorn --workers parent) once it has
+# run recover_before_workers(), so the workers' lifespans don't repeat it
+INGEST_RECOVERY_ENV = "ASKMYDATA_INGEST_RECOVERED"
+
+def fail_interrupted_ingests(db_path: Optional[str] = None, file_ids: Optional[set] = None) -> int:
+    """
+    Mark uploads still 'pending' whose ingest job will never run as 'failed'
+    and delete their saved files
+
+    file_ids=None takes every pending row - only safe before any worker has
+    queued jobs (startup); otherwise just the given ids (this process'
+    cancelled jobs at shutdown). Uses its own connection, so it works
+    without the pool (e.g. in the gunicorn master).
+
+    Returns:
+        Number of uploads marked failed
+    """
+    conn = configure_connection(sqlite3.connect(db_path or DB_PATH))
+    try:
+        with conn:
+            rows = conn.execute(SQL_PENDING_FILES).fetchall()
+            if file_ids is not None:
+                rows = [row for row in rows if row[0] in file_ids]
+            conn.executemany(SQL_FILE_FAILED, [(file_id,) for file_id, _ in rows])
+    finally:
+        conn.close()
+    for _, file_path in rows:
+        Path(file_path).unlink(missing_ok=True)
+    if rows:
+        logger.warning("Marked %d interrupted upload(s) as failed", len(rows))
+    return len(rows)
+
+def recover_before_workers():
+    """
+    Startup for a process that supervises several workers: migrate the
+    schema and fail uploads the previous run left 'pending', once, before any
+    worker can queue new ones (a restarted worker doing it in its lifespan
+    would fail jobs its siblings are still running)
+    """
+    init_db()
+    fail_interrupted_ingests()
+    os.environ[INGEST_RECOVERY_ENV] = "1"
+
+def process_file(file_id: int, file_path: str, filename: str, original_filename: str,
+                 file_type: str, collection_name: str):
+    """
+    RAG ingest for an uploaded file (parse -> chunk -> embed -> store)
+
+    Runs on ingest_executor after upload_file has answered 202; marks the
+    files row 'ready' with its row/column/chunk counts, or 'failed'.
+    """
+    from parsers.file_parser import parse_file, stream_rows, ROW_STREAM_ERRORS
+    from parsers.parser_utils import detect_content_type
+    from rag.chunking_module import dataframe_to_chunks, rows_to_chunks
+    
+    try:
+        # Steps 1+2 fast path: stream rows straight into chunks (CSV, NDJSON)
+        chunks = None
+        rows = stream_rows(file_path, file_type=file_type)
+        if rows is not None:
+            logger.debug("Streaming rows from %s", filename)
+            try:
+                first_row = next(rows, None)
+                if first_row is None:
+                    raise ValueError("Failed to parse file or file is empty")
+                num_columns = len(first_row)
+                chunks = rows_to_chunks(
+                    itertools.chain([first_row], rows),
+                    source_file=filename,
+                    # same tag the parser gives the DataFrame ('jsonl' -> 'json')
+                    content_type=detect_content_type(filename),
+                    max_tokens=500
+                )
+                num_rows = len(chunks)
+            except ROW_STREAM_ERRORS as e:
+                logger.debug("Row streaming failed (%s), falling back to DataFrame parse", e)
+                chunks = None
+        
+        if chunks is None:
+            # Step 1: Parse the file
+            logger.debug("Parsing file: %s", filename)
+            df = parse_file(file_path, file_type=file_type)
+            
+            if df is None or df.empty:
+                raise ValueError("Failed to parse file or file is empty")
+            
+            num_rows = len(df)
+            num_columns = len(df.columns)
+            
+            logger.debug("Parsed %d rows and %d columns", num_rows, num_columns)
+            
+            # Step 2: Chunk the data
+            logger.debug("Chunking data...")
+            chunks = dataframe_to_chunks(
+                df,
+                chunk_strategy="row",
+                max_tokens=500
+            )
+        
+        if not chunks:
+            raise ValueError("Failed to create chunks from file")
+        
+        logger.debug("Created %d chunks", len(chunks))
+        
+        # Step 3: Generate embeddings
+        logger.debug("Generating embeddings...")
+        emb_gen = get_embedding_generator()
+        chunks_with_embeddings = emb_gen.embed_chunks_batched(
+            chunks,
+            batch_size=EMBED_BATCH_SIZE,
+            max_workers=INGEST_PARALLEL_THREADS,
+            max_batch_tokens=MAX_BATCH_TOKENS
+        )
+        
+        if not chunks_with_embeddings:
+            raise ValueError("Failed to generate embeddings")
+        
+        logger.debug("Generated embeddings for %d chunks", len(chunks_with_embeddings))
+        
+        # Step 4: Store in vector database
+        logger.debug("Storing in vector database (collection: %s)...", collection_name)
+        
+        # Keep our own collection handle - the shared VectorStore's current
+        # collection can be switched by another ingest running in parallel
+        vs = get_vector_store()
+        collection = vs.create_collection(collection_name)
+        
+        # Add filename metadata to chunks
+        file_metadata = {'filename': original_filename, 'file_id': filename}
+        chunks_with_embeddings = [
+            {**chunk, 'metadata': {**chunk.get('metadata', {}), **file_metadata}}
+            for chunk in chunks_with_embeddings
+        ]
+        
+        vs.add_chunks(chunks_with_embeddings, collection=collection)
+        
+        logger.debug("Successfully stored in vector database")
+        
+        # Step 5: Mark the file ready
+        with get_conn(write=True) as conn, conn:
+            conn.execute(SQL_FILE_READY, (num_rows, num_columns, len(chunks), file_id))
+        
+        logger.debug("File %s processed", file_id)
+        
+    except Exception as e:
+        logger.exception("Error processing file %s: %s", file_id, e)
+        with get_conn(write=True) as conn, conn:
+            conn.execute(SQL_FILE_FAILED, (file_id,))
+        Path(file_path).unlink(missing_ok=True)
+    finally:
+        inflight_ingests.discard(file_id)
+
+@app.post("/api/files/upload", status_code=status.HTTP_202_ACCEPTED, tags=["files"])
 async def upload_file(
+    response: Response,
     file: UploadFile = File(...),
     username: str = Depends(get_current_user)
 ):
-    """Upload and process file with RAG pipeline"""
+    """
+    Upload a file and queue it for the RAG pipeline
+    
+    Answers 202 as soon as the file is saved and registered with status
+    'pending'; poll /api/files/{file_id} until it is 'ready' (or 'failed').
+    Re-uploading content the user already has (same sha256, not failed)
+    answers 200 with the existing file instead of ingesting it again.
+    """
     # Check if file is selected
     if not file.filename:
         raise HTTPException(
@@ -531,194 +1291,98 @@ async def upload_file(
             detail="No file selected"
         )
     
+    # Secure the filename once; its extension is the file type
+    original_filename = secure_filename(file.filename)
+    stem, ext = os.path.splitext(original_filename)
+    file_type = ext[1:].lower()
+    
     # Check if file type is allowed
-    if not allowed_file(file.filename):
+    if file_type not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
     try:
-        # Secure the filename and add timestamp
-        original_filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename_parts = original_filename.rsplit('.', 1)
-        filename = f"{filename_parts[0]}_{timestamp}.{filename_parts[1]}"
+        # Add timestamp to the stored name
+        now = datetime.now()
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
+        filename = f"{stem}_{timestamp}{ext}"
         
         # Save file to uploads folder
         file_path = os.path.join(UPLOAD_FOLDER, filename)
         
-        # FastAPI's UploadFile.file is async, read content
-        content = await file.read()
-        with open(file_path, 'wb') as f:
-            f.write(content)
-        
-        # Determine file type
-        file_type = filename_parts[1].lower()
+        # Stream the spooled upload to disk in 1 MiB blocks (never the whole
+        # file in memory), in the threadpool so the copy doesn't block the loop
+        file_size, content_hash = await run_in_threadpool(save_upload, file.file, file_path)
         
-        # Step 1: Parse the file
-        print(f"Parsing file: {filename}")
-        df = parse_file(file_path)
-        
-        if df is None or df.empty:
-            os.remove(file_path)  # Clean up
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to parse file or file is empty"
-            )
-        
-        num_rows = len(df)
-        num_columns = len(df.columns)
-        
-        print(f"Parsed {num_rows} rows and {num_columns} columns")
-        
-        # Step 2: Chunk the data
-        print("Chunking data...")
-        chunks = dataframe_to_chunks(
-            df,
-            chunk_strategy="row",
-            max_tokens=500
-        )
-        
-        if not chunks:
-            os.remove(file_path)
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to create chunks from file"
-            )
-        
-        print(f"Created {len(chunks)} chunks")
-        
-        # Step 3: Generate embeddings
-        print("Generating embeddings...")
-        emb_gen = get_embedding_generator()
-        chunks_with_embeddings = emb_gen.embed_chunks(chunks)
-        
-        if not chunks_with_embeddings:
-            os.remove(file_path)
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to generate embeddings"
-            )
-        
-        print(f"Generated embeddings for {len(chunks_with_embeddings)} chunks")
+        # Same bytes already uploaded - hand back that file (idx_files_user_hash)
+        existing = await fetch_one(SQL_FILE_BY_HASH, (username, content_hash))
+        if existing is not None:
+            # (same name within the same second = the same path, keep it)
+            if existing["filename"] != filename:
+                await run_in_threadpool(Path(file_path).unlink, missing_ok=True)
+            response.status_code = status.HTTP_200_OK
+            return {
+                "success": True,
+                "message": "File already uploaded",
+                "duplicate": True,
+                "file": dict(existing)
+            }
         
-        # Step 4: Store in vector database
         collection_name = f"user_{username}_files"
+        upload_date = db_timestamp(now)
         
-        print(f"Storing in vector database (collection: {collection_name})...")
-        
-        vs = get_vector_store()
-        vs.create_collection(collection_name)
-        
-        # Add filename metadata to chunks
-        for chunk in chunks_with_embeddings:
-            if 'metadata' not in chunk:
-                chunk['metadata'] = {}
-            chunk['metadata']['filename'] = original_filename
-            chunk['metadata']['file_id'] = filename
-        
-        vs.add_chunks(chunks_with_embeddings)
-        
-        print("Successfully stored in vector database")
-        
-        # Step 5: Save file metadata to database
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        
-        upload_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        c.execute(
-            """INSERT INTO files 
-               (username, filename, original_filename, file_type, file_path, 
-                upload_date, num_rows, num_columns, collection_name) 
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        # Register the file as pending
+        file_id = await execute(
+            SQL_INSERT_FILE,
             (username, filename, original_filename, file_type, file_path,
-             upload_date, num_rows, num_columns, collection_name)
+             upload_date, collection_name, content_hash, file_size)
         )
         
-        file_id = c.lastrowid
-        conn.commit()
-        conn.close()
+        logger.debug("File metadata saved to database (ID: %s, %d bytes, sha256 %s)",
+                     file_id, file_size, content_hash)
         
-        print(f"File metadata saved to database (ID: {file_id})")
+        inflight_ingests.add(file_id)
+        ingest_executor.submit(
+            process_file, file_id, file_path, filename, original_filename, file_type, collection_name
+        )
         
         return {
             "success": True,
-            "message": "File uploaded and processed successfully",
+            "message": "File uploaded, processing started",
             "file": {
                 "file_id": file_id,
                 "filename": filename,
                 "original_filename": original_filename,
                 "file_type": file_type,
-                "num_rows": num_rows,
-                "num_columns": num_columns,
-                "num_chunks": len(chunks),
+                "status": "pending",
                 "upload_date": upload_date
             }
         }
         
-    except HTTPException:
-        raise
     except Exception as e:
-        print(f"Error processing file: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error saving file: %s", e)
         
         # Clean up file if it exists
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
+        if 'file_path' in locals():
+            await run_in_threadpool(Path(file_path).unlink, missing_ok=True)
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to process file: {str(e)}"
+            detail=f"Failed to save file: {str(e)}"
         )
 
 @app.get("/api/files", tags=["files"])
 async def get_files(username: str = Depends(get_current_user)):
     """Get all files for current user"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """SELECT file_id, filename, original_filename, file_type, 
-                  upload_date, num_rows, num_columns, file_path, collection_name 
-           FROM files WHERE username = ? 
-           ORDER BY upload_date DESC""",
+    rows = await fetch_all(
+        SQL_LIST_FILES,
         (username,)
     )
-    rows = c.fetchall()
-    conn.close()
     
-    files = []
-    for row in rows:
-        # Get file size
-        file_size = 0
-        try:
-            if row[7] and os.path.exists(row[7]):
-                file_size = os.path.getsize(row[7])
-        except:
-            pass
-        
-        # Estimate num_chunks
-        num_chunks = 0
-        try:
-            vector_store = get_vector_store()
-            collection = vector_store.client.get_collection(row[8])
-            num_chunks = collection.count()
-        except:
-            num_chunks = row[5]
-        
-        files.append({
-            "file_id": row[0],
-            "filename": row[1],
-            "original_filename": row[2],
-            "file_type": row[3],
-            "upload_date": row[4],
-            "num_rows": row[5],
-            "num_columns": row[6],
-            "file_size": file_size,
-            "collection_name": row[8],
-            "num_chunks": num_chunks
-        })
+    # Sizes and chunk counts are stored at upload - no per-file I/O here
+    files = [dict(row) for row in rows]
     
     return {
         "success": True,
@@ -729,16 +1393,10 @@ async def get_files(username: str = Depends(get_current_user)):
 @app.get("/api/files/{file_id}", tags=["files"])
 async def get_file(file_id: int, username: str = Depends(get_current_user)):
     """Get specific file details"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """SELECT file_id, filename, original_filename, file_type, 
-                  upload_date, num_rows, num_columns, file_path 
-           FROM files WHERE file_id = ? AND username = ?""",
+    row = await fetch_one(
+        SQL_GET_FILE,
         (file_id, username)
     )
-    row = c.fetchone()
-    conn.close()
     
     if not row:
         raise HTTPException(
@@ -756,41 +1414,56 @@ async def get_file(file_id: int, username: str = Depends(get_current_user)):
             "upload_date": row[4],
             "num_rows": row[5],
             "num_columns": row[6],
-            "file_path": row[7]
+            "file_path": row[7],
+            "status": row[8],
+            "num_chunks": row[9]
         }
     }
 
+def delete_file_rows(conn: sqlite3.Connection, file_id: int, username: str):
+    """
+    Delete a file's rows in one write transaction
+    
+    Returns (file_path, filename, collection_name) of the deleted file, or None
+    """
+    # DELETE ... RETURNING hands back what the cleanup needs, so there's no
+    # separate lookup; both deletes share one transaction (one journal flush)
+    with conn:
+        row = conn.execute(SQL_DELETE_FILE, (file_id, username)).fetchone()
+        if row:
+            conn.execute(SQL_DELETE_FILE_CHATS, (file_id,))
+    return row
+
+def delete_file_vectors(collection_name: str, filename: str):
+    """Remove a deleted file's chunks from Chroma so they stop turning up in searches"""
+    try:
+        vs = get_vector_store()
+        vs.delete_chunks({"file_id": filename}, collection=vs.client.get_collection(collection_name))
+    except Exception as e:
+        # Rows are already gone - orphaned vectors only cost index space
+        logger.warning("Could not delete vectors of %s from %s: %s", filename, collection_name, e)
+
 @app.delete("/api/files/{file_id}", tags=["files"])
 async def delete_file(file_id: int, username: str = Depends(get_current_user)):
     """Delete a file"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    # Get file path
-    c.execute(
-        "SELECT file_path FROM files WHERE file_id = ? AND username = ?",
-        (file_id, username)
-    )
-    row = c.fetchone()
+    row = await run_in_conn(delete_file_rows, file_id, username)
     
     if not row:
-        conn.close()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="File not found"
         )
     
-    file_path = row[0]
+    file_path, filename, collection_name = row
     
-    # Delete from database
-    c.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
-    c.execute("DELETE FROM chat_history WHERE file_id = ?", (file_id,))
-    conn.commit()
-    conn.close()
+    # Delete physical file and vectors only once the rows are committed (off the event loop)
+    await run_in_threadpool(Path(file_path).unlink, missing_ok=True)
+    if collection_name:
+        await run_in_threadpool(delete_file_vectors, collection_name, filename)
     
-    # Delete physical file
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    # Last file gone - release the user's cached QueryProcessor
+    if await fetch_one(SQL_HAS_FILES, (username,)) is None:
+        invalidate_query_processor(f"user_{username}_files")
     
     return {
         "success": True,
@@ -801,6 +1474,25 @@ async def delete_file(file_id: int, username: str = Depends(get_current_user)):
 # QUERY ENDPOINTS
 # ============================================
 
+async def ask_filename(username: str, file_id: Optional[int]) -> str:
+    """One lookup: the requested file, or the user's most recent one (404/400 if none)"""
+    if file_id is not None:
+        file_row = await fetch_one(SQL_ASK_FILENAME_BY_ID, (file_id, username))
+    else:
+        file_row = await fetch_one(SQL_ASK_LATEST_FILENAME, (username,))
+    
+    if not file_row:
+        if file_id is not None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No files uploaded. Please upload a file first."
+        )
+    return file_row[0]
+
 @app.post("/api/ask", tags=["query"])
 async def ask_question(
     question_data: QuestionRequest,
@@ -808,79 +1500,34 @@ async def ask_question(
 ):
     """Ask a question about uploaded data using RAG pipeline"""
     question = question_data.question
-    file_id = question_data.file_id
+    file_id = question_data.file_id or None
     
     try:
         # Determine collection name
         collection_name = f"user_{username}_files"
         
-        # Check if user has any files uploaded
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute(
-            "SELECT COUNT(*) FROM files WHERE username = ?",
-            (username,)
-        )
-        file_count = c.fetchone()[0]
+        # Get file info for filtering
+        filename_filter = await ask_filename(username, file_id)
+        sources = [filename_filter]
         
-        if file_count == 0:
-            conn.close()
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No files uploaded. Please upload a file first."
-            )
         
-        # Get file info for filtering
-        filename_filter = None
-        if file_id:
-            c.execute(
-                "SELECT original_filename FROM files WHERE file_id = ? AND username = ?",
-                (file_id, username)
-            )
-            file_row = c.fetchone()
-            if not file_row:
-                conn.close()
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="File not found"
-                )
-            filename_filter = file_row[0]
-            sources = [file_row[0]]
-        else:
-            # Use most recent file
-            c.execute(
-                "SELECT original_filename FROM files WHERE username = ? ORDER BY upload_date DESC LIMIT 1",
-                (username,)
-            )
-            file_row = c.fetchone()
-            if file_row:
-                filename_filter = file_row[0]
-                sources = [file_row[0]]
-            else:
-                c.execute(
-                    "SELECT DISTINCT original_filename FROM files WHERE username = ?",
-                    (username,)
-                )
-                sources = [row[0] for row in c.fetchall()]
+        logger.debug("Processing question: %s (collection: %s, file filter: %s)",
+                     question, collection_name, filename_filter)
         
-        conn.close()
+        # Embed the question through the micro-batcher (batched with concurrent asks)
+        question_embedding = await asyncio.wrap_future(get_embedding_batcher().submit(question))
         
-        print(f"Processing question: {question}")
-        print(f"Collection: {collection_name}")
-        if filename_filter:
-            print(f"Filtering by file: {filename_filter}")
-        
-        # Initialize QueryProcessor
-        query_processor = QueryProcessor(
-            collection_name=collection_name,
-            embedding_model='nomic-embed-text',
-            llm_model='llama3.2',
-            chroma_persist_dir=CHROMA_DB_PATH
-        )
+        # Reuse the collection's QueryProcessor (built off the loop on first use)
+        query_processor = await run_in_threadpool(get_query_processor, collection_name)
         
-        # Process the query
-        print("Running RAG pipeline...")
-        result = query_processor.process_query(question, filename_filter=filename_filter)
+        # Process the query (vector search + LLM) off the event loop
+        logger.debug("Running RAG pipeline...")
+        result = await run_in_threadpool(
+            query_processor.process_query,
+            question,
+            filename_filter=filename_filter,
+            question_embedding=question_embedding
+        )
         
         if not result or 'answer' not in result:
             raise HTTPException(
@@ -891,27 +1538,15 @@ async def ask_question(
         answer = result['answer']
         context_used = result.get('context', [])
         
-        print(f"Answer generated: {answer[:100]}...")
-        print(f"Used {len(context_used)} context chunks")
+        logger.debug("Answer generated from %d context chunks: %.100s...", len(context_used), answer)
         
-        # Save to chat history
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        c.execute(
-            """INSERT INTO chat_history (username, file_id, question, answer, timestamp)
-               VALUES (?, ?, ?, ?, ?)""",
-            (username, file_id, question, answer, timestamp)
-        )
-        
-        chat_id = c.lastrowid
-        conn.commit()
-        conn.close()
+        # Save to chat history in the background (group-committed with other
+        # concurrent asks) - the row shows up in /api/ask/history
+        timestamp = db_timestamp()
+        chat_writer.submit((username, file_id, question, answer, timestamp))
         
         return {
             "success": True,
-            "chat_id": chat_id,
             "question": question,
             "answer": answer,
             "num_chunks_used": len(context_used),
@@ -922,56 +1557,137 @@ async def ask_question(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error processing question: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error processing question: %s", e)
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process question: {str(e)}"
         )
 
-@app.get("/api/ask/history", tags=["query"])
-async def get_chat_history(username: str = Depends(get_current_user)):
-    """Get chat history for current user"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """SELECT id, question, answer, timestamp, file_id 
-           FROM chat_history WHERE username = ? 
-           ORDER BY timestamp DESC 
-           LIMIT 50""",
-        (username,)
+@app.post("/api/ask/stream", tags=["query"])
+async def ask_question_stream(
+    question_data: QuestionRequest,
+    username: str = Depends(get_current_user)
+):
+    """
+    Same as /api/ask, but streams the answer as plain text while the LLM
+    generates it, so the first words show up without waiting for the rest
+    
+    The chat history row is written once the stream has finished.
+    """
+    question = question_data.question
+    file_id = question_data.file_id or None
+    collection_name = f"user_{username}_files"
+    
+    try:
+        # Until the response starts, failures can still be a proper 500
+        filename_filter = await ask_filename(username, file_id)
+        question_embedding = await asyncio.wrap_future(get_embedding_batcher().submit(question))
+        query_processor = await run_in_threadpool(get_query_processor, collection_name)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error processing question: %s", e)
+        
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process question: {str(e)}"
+        )
+    
+    fragments = query_processor.stream_query(
+        question,
+        filename_filter=filename_filter,
+        question_embedding=question_embedding
     )
-    rows = c.fetchall()
-    conn.close()
-    
-    history = []
-    for row in rows:
-        history.append({
-            "id": row[0],
-            "question": row[1],
-            "answer": row[2],
-            "timestamp": row[3],
-            "file_id": row[4]
-        })
+    return StreamingResponse(
+        record_answer_stream(fragments, username, file_id, question),
+        media_type="text/plain; charset=utf-8"
+    )
+
+def record_answer_stream(fragments: Iterator[str], username: str, file_id: Optional[int],
+                         question: str) -> Iterator[str]:
+    """
+    Pass the answer fragments through to the client, then queue the chat
+    history row (fire-and-forget) with the text that was sent
+
+    Sync generator - Starlette iterates it on the threadpool. The response
+    headers are already out once this runs, so an error (vector search or
+    Ollama failing mid-answer) can't become a 500: it is logged and sent as a
+    last fragment, and the row records the answer as the client saw it.
+    """
+    parts = []
+    try:
+        for part in fragments:
+            parts.append(part)
+            yield part
+    except Exception as e:
+        logger.exception("Error streaming answer: %s", e)
+        error = f"Error: Could not generate response. {str(e)}"
+        part = f"\n\n{error}" if parts else error
+        parts.append(part)
+        yield part
+    
+    timestamp = db_timestamp()
+    chat_writer.submit((username, file_id, question, "".join(parts).strip(), timestamp))
+
+@app.get("/api/ask/history", tags=["query"])
+async def get_chat_history(
+    username: str = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    before_ts: Optional[str] = Query(None, description="timestamp of the last item already received"),
+    before_id: Optional[int] = Query(None, description="id of that item (breaks timestamp ties)")
+):
+    """
+    Get chat history for current user
+    
+    Page with before_ts/before_id (keyset, preferred) or offset
+    """
+    if before_ts is not None:
+        # Without before_id, everything at before_ts counts as already seen
+        tie_id = before_id if before_id is not None else -1
+        rows = await fetch_all(
+            SQL_CHAT_HISTORY_BEFORE,
+            (username, before_ts, before_ts, tie_id, limit)
+        )
+    else:
+        rows = await fetch_all(
+            SQL_CHAT_HISTORY,
+            (username, limit, offset)
+        )
     
     return {
         "success": True,
-        "history": history,
-        "count": len(history)
+        "history": [dict(row) for row in rows],
+        "count": len(rows)
     }
 
 # ============================================
 # RUN SERVER (for development)
+# Production: gunicorn -c gunicorn.conf.py app:app
 # ============================================
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(
-        "app:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,  # Auto-reload on code changes
-        log_level="info"
-    )
+    if os.getenv("ENV") == "prod":
+        # Several worker processes on uvloop + httptools, no file watcher
+        # (gunicorn -c gunicorn.conf.py app:app does the same with a supervisor)
+        recover_before_workers()
+        uvicorn.run(
+            "app:app",
+            host="0.0.0.0",
+            port=8000,
+            workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+            loop="uvloop",
+            http="httptools",
+            log_level="info"
+        )
+    else:
+        uvicorn.run(
+            "app:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,  # Auto-reload on code changes
+            log_level="info"
+        )
 
@@ -0,0 +1,191 @@
+"""
+Connection Pool - Long-lived SQLite connections shared by the request handlers
+
+Why a pool?
+- Opening a connection per request re-opens the file, sets up WAL/SHM and
+  starts with a cold page cache every time
+- A fixed set of connections is opened once at startup, tuned once with
+  SQLITE_PRAGMAS, and handed out with `with get_conn() as conn:`
+- SQLite allows one writer at a time anyway, so writes share a single writer
+  connection (`get_conn(write=True)`) and queue for it in Python instead of
+  spinning on the database lock; the read connections are query_only
+
+Async handlers use the fetch_one / fetch_all / execute / run_in_conn helpers,
+which borrow a connection on a worker thread so no query (or wait for a free
+connection) ever blocks the event loop. Thread-side code (background tasks,
+the chat writer) uses `with get_conn(write=True) as conn:` directly.
+"""
+
+import asyncio
+import os
+import queue
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Sequence
+
+# Page cache is per connection (pool size + 1 writer, in every worker process),
+# so it's kept moderate; mmap'ed pages live in the shared OS page cache instead
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Per-connection tuning: WAL lets readers run alongside a writer, NORMAL sync
+# only fsyncs at checkpoints, busy_timeout waits out a competing writer (e.g.
+# another worker process) instead of failing with "database is locked", and
+# mmap lets reads come straight from mapped pages without read() syscalls
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+    f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+)
+
+
+def configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply SQLITE_PRAGMAS to a freshly opened connection"""
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of read-only SQLite connections plus one writer connection,
+    each backed by a queue.Queue
+
+    Connections use sqlite3.Row rows and a large statement cache, so the
+    module-level SQL constants stay prepared between requests.
+    """
+
+    def __init__(self, db_path: str, size: int = 8):
+        self.db_path = db_path
+        self.size = size
+        self._readers = queue.Queue(maxsize=size)
+        for _ in range(size):
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")  # a stray write fails loudly
+            self._readers.put(conn)
+        self._writer = queue.Queue(maxsize=1)
+        self._writer.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = configure_connection(
+            sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=512)
+        )
+        conn.row_factory = sqlite3.Row  # rows convert straight to dicts
+        return conn
+
+    @contextmanager
+    def connection(self, write: bool = False, timeout: Optional[float] = None) -> Iterator[sqlite3.Connection]:
+        """Borrow a read (or the write) connection; it is returned when the block exits"""
+        pool = self._writer if write else self._readers
+        conn = pool.get(timeout=timeout)
+        try:
+            yield conn
+        finally:
+            # Never hand the next borrower a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+            pool.put(conn)
+
+    def close(self):
+        """Close every idle connection"""
+        # SQLite's recommended shutdown step for long-lived connections:
+        # refresh planner statistics for tables whose queries could use them
+        # (cheap - it only ANALYZEs what looks stale). Needs the writer, the
+        # readers are query_only
+        try:
+            writer = self._writer.get_nowait()
+        except queue.Empty:
+            pass
+        else:
+            try:
+                writer.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            self._writer.put(writer)
+
+        for pool in (self._readers, self._writer):
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
+
+
+_pool: Optional[ConnectionPool] = None
+
+
+def init_pool(db_path: str, size: int = 8) -> ConnectionPool:
+    """Open the process-wide pool (called from the app lifespan)"""
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool(db_path, size)
+    return _pool
+
+
+def close_pool():
+    """Close the process-wide pool (called on shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+@contextmanager
+def get_conn(write: bool = False) -> Iterator[sqlite3.Connection]:
+    """
+    Borrow a pooled connection (write=True for the single writer connection)
+
+    Usage:
+        with get_conn() as conn:
+            row = conn.execute(SQL, params).fetchone()
+
+        with get_conn(write=True) as conn, conn:  # commits on success
+            conn.execute(SQL, params)
+    """
+    if _pool is None:
+        raise RuntimeError("Connection pool not initialized - call init_pool() first")
+    with _pool.connection(write=write) as conn:
+        yield conn
+
+
+def _fetch_one(sql: str, params: Sequence) -> Optional[sqlite3.Row]:
+    with get_conn() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def _fetch_all(sql: str, params: Sequence) -> List[sqlite3.Row]:
+    with get_conn() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def _execute(sql: str, params: Sequence) -> int:
+    with get_conn(write=True) as conn, conn:
+        return conn.execute(sql, params).lastrowid
+
+
+def _run_in_conn(fn: Callable, args: tuple) -> Any:
+    with get_conn(write=True) as conn:
+        return fn(conn, *args)
+
+
+async def fetch_one(sql: str, params: Sequence = ()) -> Optional[sqlite3.Row]:
+    """Run a query off the event loop and return its first row (or None)"""
+    return await asyncio.to_thread(_fetch_one, sql, params)
+
+
+async def fetch_all(sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+    """Run a query off the event loop and return all rows"""
+    return await asyncio.to_thread(_fetch_all, sql, params)
+
+
+async def execute(sql: str, params: Sequence = ()) -> int:
+    """Run one write statement in its own transaction off the event loop; returns lastrowid"""
+    return await asyncio.to_thread(_execute, sql, params)
+
+
+async def run_in_conn(fn: Callable, *args) -> Any:
+    """Call fn(conn, *args) with the writer connection on a worker thread (multi-statement write units)"""
+    return await asyncio.to_thread(_run_in_conn, fn, args)
@@ -0,0 +1,37 @@
+"""
+Gunicorn settings for running the API in production
+
+    gunicorn -c gunicorn.conf.py app:app
+
+uvicorn --reload (see app.py) is only for development.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# FastAPI is ASGI - each worker runs its own uvicorn event loop
+# (uvloop + httptools when installed - uvicorn[standard])
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count(), 4)))
+
+# Import app.py once in the master so workers share its pages copy-on-write.
+# DB connections and background threads are created lazily / in lifespan,
+# so each worker still gets its own after the fork.
+preload_app = True
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))  # /api/ask waits on the LLM
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """Runs once in the master, before any worker is forked"""
+    # app is already imported (preload_app); migrates the schema and fails
+    # uploads a previous run left 'pending' - see recover_before_workers
+    from app import recover_before_workers
+    recover_before_workers()
@@ -1,7 +1,23 @@
+import numpy as np
 import pandas as pd
+import csv
 import os
 from .parser_utils import standardize_dataframe
 
+try:
+    import pyarrow
+    import pyarrow.csv as pacsv
+except ImportError:  # optional - pandas' C engine is used without it
+    pacsv = None
+
+# Cells pandas.read_csv reads as missing by default (its na_values) - pyarrow
+# and the row streamer use the same set so every path agrees on what's NaN
+CSV_NA_VALUES = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null',
+})
+
 
 def csv_parser(file_path):
     """
@@ -14,7 +30,18 @@ def csv_parser(file_path):
         Standardized DataFrame with metadata columns
     """
     try:
-        df = pd.read_csv(file_path)
+        df = read_csv_pyarrow(file_path) if pacsv is not None else None
+        if df is None:
+            # C engine straight from the path (no in-memory copy of the file);
+            # undecodable bytes become U+FFFD instead of failing the whole file -
+            # this is the fallback when stream_csv_rows hits a UnicodeDecodeError
+            df = pd.read_csv(
+                file_path,
+                encoding='utf-8',
+                encoding_errors='replace',
+                engine='c',
+                low_memory=False
+            )
         
         # Standardize output
         filename = os.path.basename(file_path)
@@ -26,6 +53,60 @@ def csv_parser(file_path):
         print(f"Error reading CSV file: {e}")
         return None
 
+def read_csv_pyarrow(file_path):
+    """
+    Read a CSV with pyarrow's multi-threaded reader (1 MiB blocks)
+
+    Missing cells come back as NaN like pd.read_csv's (pyarrow on its own
+    keeps empty strings in text columns and hands out None).
+
+    Returns:
+        DataFrame with regular NumPy dtypes, or None if pyarrow rejects the
+        file (e.g. invalid UTF-8) so the caller can use pandas instead
+    """
+    try:
+        table = pacsv.read_csv(
+            file_path,
+            read_options=pacsv.ReadOptions(block_size=1 << 20, use_threads=True),
+            convert_options=pacsv.ConvertOptions(
+                null_values=sorted(CSV_NA_VALUES),
+                strings_can_be_null=True
+            )
+        )
+    except pyarrow.ArrowInvalid as e:
+        print(f"pyarrow could not read CSV ({e}), using pandas")
+        return None
+
+    df = table.to_pandas()
+    text_cols = df.columns[df.dtypes == object]
+    if len(text_cols):
+        df[text_cols] = df[text_cols].where(df[text_cols].notna(), np.nan)
+    return df
+
+def stream_csv_rows(file_path):
+    """
+    Yield CSV rows as dicts (header -> value) without building a DataFrame
+
+    Used by the upload path for row chunking, where a DataFrame would only be
+    stringified again. A UTF-8 BOM is skipped like pandas does, and missing
+    cells (short rows or any of CSV_NA_VALUES) come out as 'nan' - the text
+    row_to_text renders for NaN. Cells past the last header are dropped.
+    Values are otherwise kept as written, so only columns pandas would
+    re-type (e.g. ints with gaps -> 25.0, 'true' -> True) read differently.
+
+    Args:
+        file_path: Path to CSV file
+
+    Yields:
+        One dict per data row
+    """
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            yield {
+                k: 'nan' if v is None or v in CSV_NA_VALUES else v
+                for k, v in row.items() if k is not None
+            }
+
 def main():
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
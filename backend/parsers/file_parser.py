@@ -3,25 +3,48 @@ Unified File Parser Interface
 Automatically detects file type and calls appropriate parser
 """
 import os
-from .parser_utils import detect_content_type, get_file_extension
-from .csv_parser import csv_parser
-from .json_parser import parse_json_file
-from .pdf_parser import parse_pdf_to_df
-from .ical_parser import parse_ical_file
+import csv
+import importlib
+import orjson
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from .parser_utils import get_file_extension, merge_dataframes
 
 
-def parse_file(file_path):
+# Extension -> (parser module, function) dispatch table. Modules are imported
+# on first use, so a CSV upload never loads pdfplumber or icalendar
+PARSERS = {
+    'csv': ('csv_parser', 'csv_parser'),
+    'json': ('json_parser', 'parse_json_file'),
+    'jsonl': ('json_parser', 'parse_ndjson_file'),
+    'ndjson': ('json_parser', 'parse_ndjson_file'),
+    'pdf': ('pdf_parser', 'parse_pdf_to_df'),
+    'ics': ('ical_parser', 'parse_ical_file'),
+    'ical': ('ical_parser', 'parse_ical_file'),
+}
+
+
+@lru_cache(maxsize=None)
+def load_parser(module_name, func_name):
+    """Import parsers.<module_name> (once) and return its func_name"""
+    module = importlib.import_module(f'.{module_name}', __package__)
+    return getattr(module, func_name)
+
+
+def parse_file(file_path, file_type=None):
     """
     Unified parser that auto-detects file type and returns standardized DataFrame
     
     Supports:
     - CSV files
-    - JSON files
+    - JSON files (.json, and line-delimited .jsonl / .ndjson)
     - PDF files
     - iCal files (.ics)
     
     Args:
         file_path: Path to file to parse
+        file_type: Extension without the dot (e.g. 'csv') when the caller
+                   already knows it; detected from file_path if None
     
     Returns:
         Standardized DataFrame with columns:
@@ -35,19 +58,78 @@ def parse_file(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
     # Detect file type
-    extension = get_file_extension(file_path)
+    extension = file_type.lower() if file_type else get_file_extension(file_path)
     
     # Route to appropriate parser
-    if extension == 'csv':
-        return csv_parser(file_path)
-    elif extension == 'json':
-        return parse_json_file(file_path)
-    elif extension == 'pdf':
-        return parse_pdf_to_df(file_path)
-    elif extension in ['ics', 'ical']:
-        return parse_ical_file(file_path)
-    else:
+    entry = PARSERS.get(extension)
+    if entry is None:
         raise ValueError(f"Unsupported file type: .{extension}")
+    return load_parser(*entry)(file_path)
+
+
+def parse_files(file_paths, max_workers=None):
+    """
+    Parse several files in parallel and merge them into one DataFrame
+
+    Each file is independent work, so they're spread over a process pool
+    (pdfplumber/icalendar are pure Python and would serialize on the GIL in
+    threads). A single file is parsed in-process.
+
+    This is the bulk entry point for scripts and offline ingest. The upload
+    API takes one file per request and goes through parse_file/stream_rows
+    in process_file instead.
+
+    Args:
+        file_paths: Paths of the files to parse
+        max_workers: Worker processes (default: os.cpu_count(), capped at
+                     the number of files)
+
+    Returns:
+        Standardized DataFrame of every file's rows in file_paths order,
+        row_index renumbered
+
+    Raises:
+        Whatever parse_file raises for the first file that fails
+        (FileNotFoundError, ValueError for an unsupported type) - nothing
+        is merged then
+    """
+    file_paths = list(file_paths)
+    if len(file_paths) <= 1:
+        return merge_dataframes([parse_file(path) for path in file_paths], validate=False)
+
+    workers = min(max_workers or os.cpu_count() or 1, len(file_paths))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(parse_file, file_paths))
+    # parse_file's frames come from standardize_dataframe
+    return merge_dataframes(results, validate=False)
+
+
+# Extension -> row streamer for types that can skip the DataFrame
+ROW_STREAMERS = {
+    'csv': ('csv_parser', 'stream_csv_rows'),
+    'jsonl': ('json_parser', 'stream_ndjson_rows'),
+    'ndjson': ('json_parser', 'stream_ndjson_rows'),
+}
+
+# Errors a row streamer raises on input it can't read - the caller falls back
+# to parse_file() for these
+ROW_STREAM_ERRORS = (UnicodeDecodeError, csv.Error, orjson.JSONDecodeError)
+
+
+def stream_rows(file_path, file_type=None):
+    """
+    Iterate a file's rows as dicts when its type supports streaming
+
+    Args:
+        file_path: Path to file
+        file_type: Extension without the dot; detected from file_path if None
+
+    Returns:
+        Iterator of row dicts, or None if the type must go through parse_file()
+    """
+    extension = file_type.lower() if file_type else get_file_extension(file_path)
+    entry = ROW_STREAMERS.get(extension)
+    return load_parser(*entry)(file_path) if entry else None
 
 
 def main():
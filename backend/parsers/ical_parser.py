@@ -1,9 +1,13 @@
 from icalendar import Calendar
+import numpy as np
 import pandas as pd
-from datetime import datetime
 import os
+import re
 from .parser_utils import standardize_dataframe
 
+# Start of an event component - property names are case-insensitive (RFC 5545)
+VEVENT_RE = re.compile(rb"^begin:vevent", re.IGNORECASE | re.MULTILINE)
+
 
 def parse_ical_file(file_path):
     """
@@ -17,30 +21,45 @@ def parse_ical_file(file_path):
     """
     try:
         with open(file_path, "rb") as f:
-            cal = Calendar.from_ical(f.read())
+            content = f.read()
+
+        # A plain bytes scan is enough to see there are no events - skip
+        # building the component tree (pure Python) for those files
+        if VEVENT_RE.search(content) is None:
+            return standardize_dataframe(pd.DataFrame(), os.path.basename(file_path), 'ical')
+
+        cal = Calendar.from_ical(content)
+
+        # One list per column (filled in a single pass) instead of a dict
+        # per event - the DataFrame is built straight from the columns
+        summaries, starts, ends, timed, locations, descriptions = [], [], [], [], [], []
+        for component in cal.walk("VEVENT"):
+            start_dt = component.get("dtstart").dt
+            end_dt = component.get("dtend").dt
+            
+            summaries.append(str(component.get("summary", "")))
+            starts.append(start_dt)
+            ends.append(end_dt)
+            # All-day events are plain dates (no .date()) -> duration 0
+            timed.append(hasattr(start_dt, 'date') and hasattr(end_dt, 'date'))
+            locations.append(str(component.get("location", "")))
+            descriptions.append(str(component.get("description", "")))
 
-        events = []
-        for component in cal.walk():
-            if component.name == "VEVENT":
-                start_dt = component.get("dtstart").dt
-                end_dt = component.get("dtend").dt
-                
-                # Calculate duration
-                if hasattr(start_dt, 'date') and hasattr(end_dt, 'date'):
-                    duration = (end_dt - start_dt).total_seconds() / 3600
-                else:
-                    duration = 0
-                
-                events.append({
-                    "summary": str(component.get("summary", "")),
-                    "start": start_dt,
-                    "end": end_dt,
-                    "duration_hours": duration,
-                    "location": str(component.get("location", "")),
-                    "description": str(component.get("description", ""))
-                })
+        # Durations in one vectorized datetime64 subtraction instead of a
+        # timedelta per event; utc=True lines up mixed naive/aware times
+        start_ns = pd.to_datetime(starts, utc=True, errors='coerce').values
+        end_ns = pd.to_datetime(ends, utc=True, errors='coerce').values
+        hours = (end_ns - start_ns) / np.timedelta64(1, 'h')
+        durations = np.where(np.array(timed) & ~np.isnan(hours), hours, 0.0)
 
-        df = pd.DataFrame(events)
+        df = pd.DataFrame({
+            "summary": summaries,
+            "start": starts,
+            "end": ends,
+            "duration_hours": durations,
+            "location": locations,
+            "description": descriptions
+        })
         
         # Standardize output
         filename = os.path.basename(file_path)
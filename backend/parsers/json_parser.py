@@ -1,5 +1,5 @@
 import pandas as pd 
-import json
+import orjson
 import os
 from .parser_utils import standardize_dataframe
 
@@ -18,8 +18,9 @@ def parse_json_file(file_path):
         df = pd.read_json(file_path)
     except Exception as e:
         print(f"Error reading JSON file with pandas: {e}")
-        with open(file_path, 'r') as file:
-            data = json.load(file)
+        # orjson parses the raw bytes directly (no text decode pass)
+        with open(file_path, 'rb') as file:
+            data = orjson.loads(file.read())
 
         if isinstance(data, list):
             df = pd.json_normalize(data)
@@ -32,6 +33,48 @@ def parse_json_file(file_path):
     
     return standardized_df
 
+def stream_ndjson_rows(file_path):
+    """
+    Yield the objects of a line-delimited JSON file (.jsonl / .ndjson) one at
+    a time, so memory stays bounded by one line however big the file is
+
+    Non-object lines are wrapped as {'value': ...}; blank lines are skipped.
+
+    Args:
+        file_path: Path to NDJSON file
+
+    Yields:
+        One dict per line
+    """
+    with open(file_path, 'rb') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            obj = orjson.loads(line)
+            yield obj if isinstance(obj, dict) else {'value': obj}
+
+def parse_ndjson_file(file_path, chunksize=10000):
+    """
+    Parse a line-delimited JSON file into a standardized DataFrame
+
+    Reads chunksize lines at a time, so only one chunk of raw text is held
+    rather than the whole file. The parsed frames are all kept and joined,
+    so memory still grows with the file - process_file streams these files
+    through stream_ndjson_rows and only fall back to this if that fails.
+
+    Args:
+        file_path: Path to NDJSON file
+        chunksize: Lines per read
+
+    Returns:
+        Standardized DataFrame with metadata columns
+    """
+    chunks = list(pd.read_json(file_path, lines=True, chunksize=chunksize))
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+    filename = os.path.basename(file_path)
+    return standardize_dataframe(df, filename, 'json')
+
 def main():
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -2,11 +2,31 @@
 Parser Utilities - Standardization Layer
 Ensures all parsers return consistent DataFrame format for RAG pipeline
 """
+import numpy as np
 import pandas as pd
 from typing import Union, Dict, List
 import os
 
 
+# Extension -> content type for detect_content_type()
+_TYPE_MAP = {
+    'csv': 'csv',
+    'json': 'json',
+    'jsonl': 'json',
+    'ndjson': 'json',
+    'pdf': 'pdf',
+    'ics': 'ical',
+    'ical': 'ical',
+}
+
+# Columns standardize_dataframe() prepends
+METADATA_COLUMNS = ('source_file', 'content_type', 'row_index')
+
+# concat(copy=False) shares the input columns on pandas 2; pandas 3 does that
+# anyway (Copy-on-Write) and deprecates the keyword
+_CONCAT_NO_COPY = {'copy': False} if int(pd.__version__.split('.')[0]) < 3 else {}
+
+
 def standardize_dataframe(df: pd.DataFrame, source_file: str, content_type: str) -> pd.DataFrame:
     """
     Standardize any DataFrame to consistent format for RAG pipeline
@@ -23,18 +43,32 @@ def standardize_dataframe(df: pd.DataFrame, source_file: str, content_type: str)
     
     Returns:
         Standardized DataFrame with metadata columns prepended
+
+    Raises:
+        ValueError: If df already has a column named like a metadata column
     """
     if df is None or df.empty:
         # Return empty DataFrame with standard columns
         return pd.DataFrame(columns=['source_file', 'content_type', 'row_index'])
-    
-    standardized = df.copy()
-    
-    # Add standard metadata columns at the beginning
-    standardized.insert(0, 'source_file', source_file)
-    standardized.insert(1, 'content_type', content_type)
-    standardized.insert(2, 'row_index', range(len(df)))
-    
+
+    # concat would quietly keep both copies of the name (df.insert refused)
+    clashes = [col for col in METADATA_COLUMNS if col in df.columns]
+    if clashes:
+        raise ValueError(f"Data already has reserved metadata columns: {clashes}")
+    
+    # Build the metadata columns as one frame and put it in front with a single
+    # concat (three insert() calls each re-shuffled every column); the data
+    # columns are shared with df rather than copied. meta reuses df's own index
+    # so concat has nothing to align (df.reset_index() would copy every column)
+    # and the result just gets a fresh RangeIndex afterwards
+    n = len(df)
+    meta = pd.DataFrame({
+        'source_file': np.full(n, source_file, dtype=object),
+        'content_type': np.full(n, content_type, dtype=object),
+        'row_index': np.arange(n, dtype=np.int64),
+    }, index=df.index)
+    standardized = pd.concat([meta, df], axis=1, **_CONCAT_NO_COPY)
+    standardized.index = pd.RangeIndex(n)
     return standardized
 
 
@@ -67,13 +101,15 @@ def validate_dataframe(df: pd.DataFrame) -> bool:
     return True
 
 
-def merge_dataframes(dfs: List[pd.DataFrame]) -> pd.DataFrame:
+def merge_dataframes(dfs: List[pd.DataFrame], validate: bool = True) -> pd.DataFrame:
     """
     Merge multiple standardized DataFrames
     Useful for combining multiple file uploads
     
     Args:
         dfs: List of standardized DataFrames
+        validate: Run validate_dataframe() on each frame first; callers whose
+                  frames all come from standardize_dataframe() can skip it
     
     Returns:
         Single merged DataFrame with re-indexed rows
@@ -81,13 +117,13 @@ def merge_dataframes(dfs: List[pd.DataFrame]) -> pd.DataFrame:
     if not dfs:
         return pd.DataFrame(columns=['source_file', 'content_type', 'row_index'])
     
-    # Validate all DataFrames
-    for df in dfs:
-        validate_dataframe(df)
+    if validate:
+        for df in dfs:
+            validate_dataframe(df)
     
     # Concatenate and reset index
-    merged = pd.concat(dfs, ignore_index=True)
-    merged['row_index'] = range(len(merged))
+    merged = pd.concat(dfs, ignore_index=True, **_CONCAT_NO_COPY)
+    merged['row_index'] = np.arange(len(merged), dtype=np.int64)
     
     return merged
 
@@ -115,14 +151,4 @@ def detect_content_type(file_path: str) -> str:
     Returns:
         Content type string
     """
-    extension = get_file_extension(file_path)
-    
-    type_mapping = {
-        'csv': 'csv',
-        'json': 'json',
-        'pdf': 'pdf',
-        'ics': 'ical',
-        'ical': 'ical'
-    }
-    
-    return type_mapping.get(extension, 'unknown')
+    return _TYPE_MAP.get(os.path.splitext(file_path)[1][1:].lower(), 'unknown')
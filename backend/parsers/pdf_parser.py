@@ -7,12 +7,16 @@ MAIN FUNCTIONS:
 1. parse_pdf_file(file_path) - Extract text, tables, and metadata from PDF
 2. parse_pdf_to_df(file_path) - Get unified DataFrame output (tables or text)
 3. parse_pdf_adaptive(file_path) - Automatically choose best parsing strategy
+4. parse_pdfs_batch(file_paths) - parse_pdf_file over many PDFs on a process pool
 
 SPECIALIZED FUNCTIONS:
 - parse_text(file_path) - Extract raw text with page markers
+- parse_text_by_page(file_path) - Extract text as (page_num, text) pairs
 - parse_text_structured(file_path) - Extract text as paragraph-level DataFrame
 - parse_tabular(file_path) - Extract tables as list of DataFrames
 - parse_tabular_with_context(file_path) - Extract tables with page context
+- iter_pages_text(file_path) / iter_tables(file_path) - Stream text / tables
+  page by page with bounded memory (for very large PDFs)
 - get_metadata(file_path) - Get PDF metadata (pages, file info, etc.)
 - analyze_pdf_type(file_path) - Determine if PDF is text/table/mixed
 
@@ -33,24 +37,45 @@ import pdfplumber  # Best all-around library
 import pandas as pd
 import os 
 import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from .parser_utils import standardize_dataframe 
 
+# Larger PDFs are read in page ranges on a small thread pool. Each worker opens
+# its own handle - pdfplumber/pdfminer objects aren't safe to share between
+# threads - and ranges are stitched back together in page order
+PDF_WORKERS = min(os.cpu_count() or 1, 4)
+PARALLEL_MIN_PAGES = 8
+
+# Pages per open handle when streaming (iter_pages): re-opening the file drops
+# pdfminer's caches for the batch that's done
+PDF_BATCH_PAGES = 500
+
+# Paragraph breaks (blank line, possibly with whitespace) and the page markers
+# parse_text() inserts
+_PARA_RE = re.compile(r'\n\s*\n')
+_PAGE_MARKER_RE = re.compile(r'--- Page \d+ ---')
+
+
+def parse_pdf_file(file_path):
 
-def parse_pdf_file(file_path): 
-    
     #Break down the pdf into three main components (text, tables, metadata)
-    # Main function returns a dictionary with 'text, 'tables', and 'metadata' 
+    # Main function returns a dictionary with 'text, 'tables', and 'metadata'
+    # The PDF is opened once and every page is read once - text, tables and
+    # the metadata all come out of the same pass
     try:
-        results = {
-            'text': '',
-            'tables':[],
-            'metadata': {}
-        }
-        results['text'] = parse_text(file_path)
-        results['tables'] = parse_tabular(file_path)
-        results['metadata'] = get_metadata(file_path)
+        pages, num_pages = _read_pages(file_path)
 
-        return results
+        tables = [df for _, _, page_tables in pages for df in page_tables]
+        return {
+            'text': _join_page_text(pages),
+            'tables': tables,
+            'metadata': {
+                'num_pages': num_pages,
+                'has_tables': bool(tables),
+                'file_size_bytes': os.path.getsize(file_path),
+                'file_name': os.path.basename(file_path)
+            }
+        }
     except Exception as e:
         print(f"Error parsing PDF file: {e}")
         return {
@@ -59,72 +84,137 @@ def parse_pdf_file(file_path):
             'metadata': {'error': str(e)}
         }
 
+def _page_tables(page, page_num):
+    """Tables on one page as DataFrames tagged with page / table number"""
+    page_tables = []
+    for table_num, table in enumerate(page.extract_tables()):
+        if table: #convert the table to a DataFrame if it exists
+            df = pd.DataFrame(table[1:], columns=table[0])
+
+            #Add metadata about page and table number
+            df.attrs['page'] = page_num
+            df.attrs['table_num'] = table_num + 1
+
+            page_tables.append(df)
+    return page_tables
+
+def _iter_pages(pdf, text=True, tables=True, first=0, last=None):
+    """
+    Single pass over an open pdfplumber PDF (pages first..last-1, 0-based)
+
+    Yields (page_num, text, tables) per page; text is '' and tables is []
+    when that part wasn't asked for (or the page has none)
+    """
+    for page_num, page in enumerate(pdf.pages[first:last], start = first + 1):
+        page_text = (page.extract_text() or "") if text else ""
+        page_tables = _page_tables(page, page_num) if tables else []
+        page.close()  # free the page's parsed chars/layout objects
+        yield page_num, page_text, page_tables
+
+def _read_page_range(file_path, first, last, text, tables):
+    """Extract pages first..last-1 with a handle of this thread's own"""
+    with pdfplumber.open(file_path) as pdf:
+        return list(_iter_pages(pdf, text, tables, first, last))
+
+def _read_pages(file_path, text=True, tables=True):
+    """
+    Every page of a PDF as (page_num, text, tables) in page order, plus the
+    page count. Short documents are read in one pass on the calling thread
+    """
+    with pdfplumber.open(file_path) as pdf:
+        num_pages = len(pdf.pages)
+        if num_pages < PARALLEL_MIN_PAGES or PDF_WORKERS == 1:
+            return list(_iter_pages(pdf, text, tables)), num_pages
+
+    step = -(-num_pages // PDF_WORKERS)  # ceil
+    with ThreadPoolExecutor(max_workers=PDF_WORKERS) as executor:
+        futures = [
+            executor.submit(_read_page_range, file_path, first, first + step, text, tables)
+            for first in range(0, num_pages, step)
+        ]
+        pages = [page for future in futures for page in future.result()]
+    return pages, num_pages
+
+def iter_pages(file_path, text=True, tables=True, batch_size=PDF_BATCH_PAGES):
+    """
+    Stream a PDF as (page_num, text, tables), one page at a time
+
+    The file is opened once per batch_size pages, so peak memory follows the
+    batch rather than the whole document (5000+ page PDFs)
+    """
+    first = 0
+    while True:
+        with pdfplumber.open(file_path) as pdf:
+            num_pages = len(pdf.pages)
+            yield from _iter_pages(pdf, text, tables, first, first + batch_size)
+        first += batch_size
+        if first >= num_pages:
+            break
+
+def iter_pages_text(file_path, batch_size=PDF_BATCH_PAGES):
+    """Yield (page_num, text) for each page that has text"""
+    for page_num, text, _ in iter_pages(file_path, tables=False, batch_size=batch_size):
+        if text:
+            yield page_num, text
+
+def iter_tables(file_path, batch_size=PDF_BATCH_PAGES):
+    """Yield (page_num, df) for each table, tagged like parse_tabular()'s"""
+    for page_num, _, page_tables in iter_pages(file_path, text=False, batch_size=batch_size):
+        for df in page_tables:
+            yield page_num, df
+
+def _join_page_text(pages):
+    """Combine page texts with page separators (pages without text are skipped)"""
+    return "\n".join(
+        f"--- Page {page_num} ---\n{text}\n" for page_num, text, _ in pages if text
+    )
+
 def parse_text(file_path):
     " Extract text from PDF using pdfplumber"
     # Open pdf using pdfplumber:
-    # Loop through each page 
-    # Extract text from each page 
-    # combine all the text with page seperators 
+    # Loop through each page
+    # Extract text from each page
+    # combine all the text with page seperators
 
-    full_text = []
+    pages, _ = _read_pages(file_path, tables=False)
+    return _join_page_text(pages)
 
-    with pdfplumber.open(file_path) as pdf: 
-        for page_num, page in enumerate(pdf.pages, start = 1):
-            text = page.extract_text()
-            if text: 
-                full_text.append(f"--- Page {page_num} ---\n{text}\n")
 
-    return "\n".join(full_text)
+def parse_text_by_page(file_path):
+    """Extract text as [(page_num, text), ...] for pages that have text (no markers to strip)"""
+    pages, _ = _read_pages(file_path, tables=False)
+    return [(page_num, text) for page_num, text, _ in pages if text]
 
 
 def parse_tabular(file_path):
     " Extract tables from PDF using pdfplumber"
     # Open pdf using pdfplumber:
-    # Check each page for tables 
+    # Check each page for tables
     # Convert each table to pandas DataFrame
     # Store DataFrames in a list and return
 
-    all_tables = []
-
-    with pdfplumber.open(file_path) as pdf: 
-        for page_num, page in enumerate(pdf.pages, start = 1):
-            tables = page.extract_tables()
-            
-            for table_num, table in enumerate(tables):
-                    if table: #convert the table to a DataFrame if it exists
-                        df = pd.DataFrame(table[1:], columns=table[0])
+    pages, _ = _read_pages(file_path, text=False)
+    return [df for _, _, page_tables in pages for df in page_tables]
 
-                        #Add metadata about page and table number
-                        df.attrs['page'] = page_num
-                        df.attrs['table_num'] = table_num + 1
 
-                        all_tables.append(df)
+def _add_table_context(pages):
+    """Tag each page's tables with surrounding context (page text, dimensions)"""
+    all_tables = []
+    for _, page_text, page_tables in pages:
+        for df in page_tables:
+            # Enhanced metadata
+            df.attrs['page_text'] = page_text[:500]  # First 500 chars of page
+            df.attrs['row_count'] = len(df)
+            df.attrs['col_count'] = len(df.columns)
+
+            all_tables.append(df)
     return all_tables
 
 
 def parse_tabular_with_context(file_path):
     """Extract tables with surrounding context"""
-    all_tables = []
-    
-    with pdfplumber.open(file_path) as pdf: 
-        for page_num, page in enumerate(pdf.pages, start=1):
-            page_text = page.extract_text() or ""
-            tables = page.extract_tables()
-            
-            for table_num, table in enumerate(tables):
-                if table:
-                    df = pd.DataFrame(table[1:], columns=table[0])
-                    
-                    # Enhanced metadata
-                    df.attrs['page'] = page_num
-                    df.attrs['table_num'] = table_num + 1
-                    df.attrs['page_text'] = page_text[:500]  # First 500 chars of page
-                    df.attrs['row_count'] = len(df)
-                    df.attrs['col_count'] = len(df.columns)
-                    
-                    all_tables.append(df)
-    
-    return all_tables
+    pages, _ = _read_pages(file_path)
+    return _add_table_context(pages)
 
 
 def get_metadata(file_path):
@@ -153,28 +243,39 @@ def get_metadata(file_path):
 def split_into_paragraphs(text):
     """Split text into paragraphs"""
     # Split on double newlines or large gaps
-    paragraphs = re.split(r'\n\s*\n', text)
-    return [p.strip() for p in paragraphs if p.strip()]
+    return [p for p in map(str.strip, _PARA_RE.split(text)) if p]
+
+def iter_paragraphs(text):
+    """split_into_paragraphs() as a generator - no list of raw pieces in between"""
+    start = 0
+    for match in _PARA_RE.finditer(text):
+        paragraph = text[start:match.start()].strip()
+        if paragraph:
+            yield paragraph
+        start = match.end()
+    paragraph = text[start:].strip()
+    if paragraph:
+        yield paragraph
+
+def _paragraphs_df(pages):
+    """Paragraph-level DataFrame from (page_num, text, tables) pages"""
+    all_chunks = []
+    for page_num, text, _ in pages:
+        if text:
+            for para_num, paragraph in enumerate(iter_paragraphs(text), start=1):
+                all_chunks.append({
+                    'page': page_num,
+                    'paragraph': para_num,
+                    'content': paragraph,
+                    'length': len(paragraph)
+                })
+
+    return pd.DataFrame(all_chunks)  # Already a DataFrame!
 
 def parse_text_structured(file_path):
     """Extract text with paragraph-level granularity"""
-    all_chunks = []
-    
-    with pdfplumber.open(file_path) as pdf: 
-        for page_num, page in enumerate(pdf.pages, start=1):
-            text = page.extract_text()
-            if text:
-                paragraphs = split_into_paragraphs(text)
-                
-                for para_num, paragraph in enumerate(paragraphs, start=1):
-                    all_chunks.append({
-                        'page': page_num,
-                        'paragraph': para_num,
-                        'content': paragraph,
-                        'length': len(paragraph)
-                    })
-    
-    return pd.DataFrame(all_chunks)  # Already a DataFrame!
+    pages, _ = _read_pages(file_path, tables=False)
+    return _paragraphs_df(pages)
 
 
 
@@ -182,28 +283,40 @@ def parse_pdf_to_df(file_path):
     """
     Parse PDF with improved chunking for better RAG
     """
-    filename = os.path.basename(file_path)
-    result = parse_pdf_file(file_path)
-    
+    try:
+        pages, _ = _read_pages(file_path)
+    except Exception as e:
+        print(f"Error parsing PDF file: {e}")
+        pages = []
+    return _pdf_to_df(pages, os.path.basename(file_path))
+
+
+def _pdf_to_df(pages, filename):
+    """Unified DataFrame (tables, else semantic text chunks) from (page_num, text, tables) pages"""
     # Priority 1: If tables exist, use them
-    if result['tables']:
-        combined_df = pd.concat(result['tables'], ignore_index=True)
+    tables = [df for _, _, page_tables in pages for df in page_tables]
+    if tables:
+        combined_df = pd.concat(tables, ignore_index=True)
         return standardize_dataframe(combined_df, filename, 'pdf_table')
-    
+
     # Priority 2: For text PDFs, chunk by paragraphs not pages
-    text = result['text']
-    
-    if not text.strip():
+    # Paragraphs come straight from each page's text - no joined blob with
+    # page markers to strip and re-split
+    paragraphs = [
+        p.strip() for _, text, _ in pages if text for p in text.split('\n\n') if p.strip()
+    ]
+
+    if not paragraphs:
         return pd.DataFrame(columns=['source_file', 'content_type', 'row_index'])
-    
+
     # Split into meaningful chunks (paragraphs or sections)
-    chunks = split_into_semantic_chunks(text)
-    
+    chunks = pack_paragraphs(paragraphs)
+
     df = pd.DataFrame({
         'content': chunks,
         'chunk_size': [len(c) for c in chunks]
     })
-    
+
     return standardize_dataframe(df, filename, 'pdf_text')
 
 
@@ -212,11 +325,18 @@ def split_into_semantic_chunks(text: str, max_chunk_size: int = 500) -> list[str
     Split text into semantic chunks (by paragraphs, preserving context)
     """
     # Remove page markers
-    text = re.sub(r'--- Page \d+ ---', '', text)
+    text = _PAGE_MARKER_RE.sub('', text)
     
     # Split by double newlines (paragraphs)
     paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
     
+    return pack_paragraphs(paragraphs, max_chunk_size)
+
+
+def pack_paragraphs(paragraphs: list[str], max_chunk_size: int = 500) -> list[str]:
+    """
+    Greedily combine consecutive paragraphs into chunks of up to max_chunk_size chars
+    """
     chunks = []
     current_chunk = ""
     
@@ -235,16 +355,8 @@ def split_into_semantic_chunks(text: str, max_chunk_size: int = 500) -> list[str
     return chunks
 
 
-def analyze_pdf_type(file_path):
-    """
-    Determine if PDF is primarily text, tables, or mixed
-    """
-    metadata = get_metadata(file_path)
-    result = parse_pdf_file(file_path)
-    
-    text_length = len(result['text'])
-    table_count = len(result['tables'])
-    
+def _classify_pdf(text_length, table_count):
+    """'text_only' / 'table_heavy' / 'mixed' from the amount of text and tables"""
     if table_count == 0:
         return 'text_only'
     elif text_length < 500 and table_count > 0:
@@ -252,23 +364,64 @@ def analyze_pdf_type(file_path):
     else:
         return 'mixed'
 
+def analyze_pdf_type(file_path):
+    """
+    Determine if PDF is primarily text, tables, or mixed
+    """
+    result = parse_pdf_file(file_path)
+    return _classify_pdf(len(result['text']), len(result['tables']))
+
 def parse_pdf_adaptive(file_path):
     """
     Parse PDF differently based on content type
+
+    The PDF is read once; the type check and whichever outputs it picks are
+    all built from that same pass
     """
-    pdf_type = analyze_pdf_type(file_path)
-    
+    pages, _ = _read_pages(file_path)
+
+    tables = [df for _, _, page_tables in pages for df in page_tables]
+    text = _join_page_text(pages)
+    pdf_type = _classify_pdf(len(text), len(tables))
+
     if pdf_type == 'text_only':
-        return parse_text_structured(file_path)  # Paragraph-level DF
+        return _paragraphs_df(pages)  # Paragraph-level DF
     elif pdf_type == 'table_heavy':
-        return parse_pdf_to_df(file_path)  # Combined tables
+        return _pdf_to_df(pages, os.path.basename(file_path))  # Combined tables
     else:
         # For mixed content, return both
         return {
-            'text_df': parse_text_structured(file_path),
-            'tables': parse_tabular_with_context(file_path)
+            'text_df': _paragraphs_df(pages),
+            'tables': _add_table_context(pages)
         }
 
+def parse_pdfs_batch(file_paths, workers=None):
+    """
+    Run parse_pdf_file over many PDFs in parallel
+
+    pdfminer is pure Python, so separate processes (not threads) are what
+    scales with cores here. Only the paths are sent to the workers.
+
+    Meant for bulk / offline extraction (e.g. loading a folder of reports in
+    a script) - uploads are one file per request and use parse_pdf_to_df.
+
+    Args:
+        file_paths: Paths of the PDFs to parse
+        workers: Worker processes (default: os.cpu_count())
+
+    Returns:
+        List of parse_pdf_file() results, in the order of file_paths. A PDF
+        that can't be read doesn't stop the batch - like parse_pdf_file, its
+        slot holds empty text/tables and metadata {'error': ...}
+    """
+    file_paths = list(file_paths)
+    if len(file_paths) <= 1:
+        return [parse_pdf_file(path) for path in file_paths]
+
+    workers = min(workers or os.cpu_count() or 1, len(file_paths))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse_pdf_file, file_paths, chunksize=2))
+
 def main():
     """
     Comprehensive test of all PDF parser functions
@@ -10,29 +10,74 @@ What is chunking?
 For tabular data: 1 row = 1 chunk works well
 """
 
+import os
 import pandas as pd 
-from typing import List, Dict 
+from functools import lru_cache
+from typing import List, Dict, Iterable, Optional 
 import tiktoken 
 
+@lru_cache(maxsize=None)
+def get_encoding(model: str = "gpt-3.5-turbo"):
+    """tiktoken encoding for a model (looked up once per model)"""
+    return tiktoken.encoding_for_model(model)
+
 def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
     """Count the number of tokens in a given text for a specified model."""
-    encoding = tiktoken.encoding_for_model(model)
-    return len(encoding.encode(text))
+    return len(get_encoding(model).encode(text))
+
+def count_tokens_batch(texts: List[str], model: str = "gpt-3.5-turbo") -> List[int]:
+    """
+    Token counts for many texts in one call - tiktoken encodes the batch on
+    its own threads in Rust instead of one Python->Rust round trip per text
+    """
+    encoded = get_encoding(model).encode_ordinary_batch(texts, num_threads=os.cpu_count() or 1)
+    return [len(tokens) for tokens in encoded]
+
+# Standard metadata columns added by parsers.parser_utils.standardize_dataframe
+METADATA_COLS = ['source_file', 'content_type', 'row_index']
 
 def row_to_text(row: pd.Series, include_column_names: bool = True) -> str:
     """Convert a single DataFrame row to readable text, excluding metadata"""
-    # Exclude standard metadata columns
-    metadata_cols = ['source_file', 'content_type', 'row_index']
-    
     # Filter out metadata columns
-    data_cols = {k: v for k, v in row.items() if k not in metadata_cols}
+    data_cols = {k: v for k, v in row.items() if k not in METADATA_COLS}
     
     if include_column_names:
         parts = [f"{col}: {val}" for col, val in data_cols.items()]
         return ", ".join(parts)
     else:
         return ", ".join(str(val) for val in data_cols.values())
-    
+
+def rows_to_texts(df: pd.DataFrame) -> List[str]:
+    """
+    row_to_text() for every row of df at once - same text, no Series per row
+
+    Each column is formatted in one pass over its values (the same scalars
+    iterrows() hands row_to_text: Timestamps keep their time, NaN is 'nan')
+    and the pieces are joined per row. When iterrows() would up-cast the row
+    (all-numeric frames of mixed dtypes, e.g. ints shown as floats) the
+    per-row path is used so the text stays identical.
+    """
+    if len(df.columns) and not _rows_keep_dtypes(df):
+        return [row_to_text(row) for _, row in df.iterrows()]
+
+    data_cols = [col for col in df.columns if col not in METADATA_COLS]
+    if not data_cols:
+        return [""] * len(df)
+
+    columns = [
+        list(map(f"{col}: ".__add__, map(format, df[col].astype(object))))
+        for col in data_cols
+    ]
+    return list(map(", ".join, zip(*columns)))
+
+def _rows_keep_dtypes(df: pd.DataFrame) -> bool:
+    """True if iterrows() rows hold each column's own scalars (no common-dtype cast)"""
+    dtypes = df.dtypes
+    return (
+        dtypes.nunique() == 1
+        or any(pd.api.types.is_object_dtype(dt) or pd.api.types.is_string_dtype(dt) for dt in dtypes)
+    )
+
 def dataframe_to_chunks(
         df:pd.DataFrame,
         chunk_strategy: str = "row",
@@ -64,37 +109,74 @@ def dataframe_to_chunks(
      chunks = []
 
      if chunk_strategy == "row": 
-         for idx, row in df.iterrows():
-            #convert the row to text
-            text = row_to_text(row)
-             #count tokens 
-            token_count = count_tokens(text)
-
-            if token_count>max_tokens: 
-                print(f"Row {idx} exceeds max tokens ({token_count})")
-                
-
-            # Extract metadata from standardized columns
-            source_file = row.get('source_file', 'unknown')
-            content_type = row.get('content_type', 'unknown')
-            row_index = row.get('row_index', idx)
-            
-            # Create chunk with metadata
-            chunk = {
-                'text': text,
-                'metadata': {
-                    'source_file': source_file,
-                    'content_type': content_type,
-                    'row_index': int(row_index),
-                    'chunk_id': f"{source_file}_{row_index}",
-                    'token_count': token_count
-                }
-            }
-            
-            chunks.append(chunk)
+         #convert the rows to text
+         texts = rows_to_texts(df)
+
+         # Extract metadata from standardized columns
+         n = len(df)
+         source_files = df['source_file'].tolist() if 'source_file' in df.columns else ['unknown'] * n
+         content_types = df['content_type'].tolist() if 'content_type' in df.columns else ['unknown'] * n
+         row_indexes = df['row_index'].tolist() if 'row_index' in df.columns else df.index.tolist()
+
+         # Count every row's tokens in one batch
+         token_counts = count_tokens_batch(texts)
+         chunks = [
+             make_chunk(text, source_file, content_type, int(row_index), max_tokens, token_count)
+             for text, source_file, content_type, row_index, token_count
+             in zip(texts, source_files, content_types, row_indexes, token_counts)
+         ]
     
      return chunks
 
+def make_chunk(text: str, source_file: str, content_type: str, row_index: int, max_tokens: int,
+               token_count: Optional[int] = None) -> Dict:
+    """Build one chunk dict (text + metadata) for a row"""
+    #count tokens (unless the caller already counted them in a batch)
+    if token_count is None:
+        token_count = count_tokens(text)
+
+    if token_count>max_tokens: 
+        print(f"Row {row_index} exceeds max tokens ({token_count})")
+
+    return {
+        'text': text,
+        'metadata': {
+            'source_file': source_file,
+            'content_type': content_type,
+            'row_index': row_index,
+            'chunk_id': f"{source_file}_{row_index}",
+            'token_count': token_count
+        }
+    }
+
+def rows_to_chunks(
+        rows: Iterable[Dict],
+        source_file: str,
+        content_type: str,
+        max_tokens: int = 512
+) -> List[Dict[str, any]]:
+    """
+    Row-strategy chunking straight from an iterator of row dicts
+    (e.g. parsers.file_parser.stream_rows) - no DataFrame in between
+
+    Args:
+        rows: Iterable of {column: value} dicts
+        source_file: Name of the source file (goes into metadata / chunk_id)
+        content_type: Type of content ('csv', ...)
+        max_tokens: Maximum tokens per chunk
+
+    Returns:
+        Chunk dicts shaped like dataframe_to_chunks(..., chunk_strategy='row');
+        the text matches too as long as the values are the strings a parsed
+        DataFrame would render (see parsers.csv_parser.stream_csv_rows)
+    """
+    texts = [", ".join(f"{col}: {val}" for col, val in row.items()) for row in rows]
+    token_counts = count_tokens_batch(texts)
+    return [
+        make_chunk(text, source_file, content_type, row_index, max_tokens, token_count)
+        for row_index, (text, token_count) in enumerate(zip(texts, token_counts))
+    ]
+
 def main():
     #Test the chunking modelule with sample data
     sample_data = {
@@ -9,8 +9,18 @@ What does this do?
 """
 
 import ollama 
+try:
+    from .ollama_client import client
+except ImportError:  # run as a script from rag/
+    from ollama_client import client
 from typing import List, Dict
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import OrderedDict
 import numpy as np 
+import hashlib
+import queue
+import threading
+import time
 
 
 class EmbeddingGenerator: 
@@ -23,8 +33,18 @@ class EmbeddingGenerator:
     - Handles batching and errors
     """
 
-    def __init__(self, model_name: str = "nomic-embed-text"): 
+    def __init__(self, model_name: str = "nomic-embed-text", keep_alive: str = None, max_retries: int = 4): 
+        """
+        Args:
+            model_name: Ollama embedding model (a quantized tag such as a q8_0
+                        build runs faster on CPU with near-identical vectors)
+            keep_alive: How long Ollama keeps the model loaded between calls
+                        (None = Ollama default), avoids reloading it from disk
+            max_retries: Retries (exponential backoff) when Ollama answers 429/503
+        """
         self.model_name = model_name 
+        self.keep_alive = keep_alive
+        self.max_retries = max_retries
         self.embedding_dim = 768 # Nomic-embed-text outputs 768 dimensional vectors 
         print(f"✓ Embedding generator initialized (model: {model_name})") 
 
@@ -40,9 +60,10 @@ class EmbeddingGenerator:
         """
 
         try: 
-            response = ollama.embeddings(
+            response = client.embeddings(
                 model=self.model_name,
-                prompt=text
+                prompt=text,
+                keep_alive=self.keep_alive
             )
             # Response is an EmbeddingsResponse object with .embedding attribute
             return response.embedding
@@ -51,25 +72,59 @@ class EmbeddingGenerator:
             import traceback
             traceback.print_exc()
             return [0.0] * self.embedding_dim # Return zero vector on error 
+
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several texts in ONE Ollama request
+
+        Args:
+            texts: List of text strings
+
+        Returns:
+            List of embedding vectors, same order as texts
+        """
+        try:
+            return self._embed_request(texts)
+        except Exception as e:
+            print(f"Error occurred while generating batch embeddings: {e}")
+            import traceback
+            traceback.print_exc()
+            return [[0.0] * self.embedding_dim for _ in texts]
     
-    def embed_batch(self, texts: List[str]) -> List[List[float]]: 
+    def _embed_request(self, texts: List[str]) -> List[List[float]]:
+        """One ollama.embed call for texts; retries 429/503 with backoff, raises otherwise"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = client.embed(
+                    model=self.model_name,
+                    input=texts,
+                    keep_alive=self.keep_alive
+                )
+                return response['embeddings']
+            except ollama.ResponseError as e:
+                # Server busy (queue full / overloaded) - back off and retry
+                if e.status_code not in (429, 503) or attempt == self.max_retries:
+                    raise
+                time.sleep(0.5 * 2 ** attempt)
+
+    def embed_batch(self, texts: List[str], batch_size: int = 64) -> List[List[float]]: 
         """
         Generate embeddings for mutiple texts 
 
+        Sends `batch_size` texts per Ollama request instead of one request per text
+
         Args: 
             texts: List of text strings 
+            batch_size: Number of texts per request
         Returns: 
             List of embedding vectors
         """
         embeddings = []
         total = len(texts)
 
-        for i, text in enumerate(texts, 1): 
-            if i%10 ==0: # Cool progress indicator 
-                print(f"Embedding {i}/{total}...")
-
-            embedding = self.embed(text)
-            embeddings.append(embedding)
+        for start in range(0, total, batch_size): 
+            embeddings.extend(self.embed_many(texts[start:start + batch_size]))
+            print(f"Embedding {len(embeddings)}/{total}...")
         return embeddings 
 
     def embed_chunks(self, chunks: List[Dict]) -> List[Dict]:
@@ -97,6 +152,160 @@ class EmbeddingGenerator:
         print(" Embeddings generated successfully!")
         return chunks
 
+    def embed_chunks_batched(
+            self,
+            chunks: List[Dict],
+            batch_size: int = 32,
+            max_workers: int = 1,
+            max_batch_tokens: int = 16384
+    ) -> List[Dict]:
+        """
+        Add embeddings to chunk dictionaries, packed into token-aware batches
+
+        Chunks are grouped by text length so each request holds similarly sized
+        texts (less padding inside the model); a batch is closed when it reaches
+        `batch_size` chunks or about `max_batch_tokens` tokens, so many short
+        chunks share a request while long ones don't overload it. Results go
+        back in original order. With max_workers > 1 several batch requests are
+        in flight at once - keep it at or below the server's OLLAMA_NUM_PARALLEL.
+
+        Args:
+            chunks: List of chunk dicts from chunking.py
+            batch_size: Max number of texts per request
+            max_workers: Number of concurrent batch requests
+            max_batch_tokens: Max estimated tokens (len(text) // 4) per request
+
+        Returns:
+            Same chunks with 'embedding' field added
+        """
+        print(f"Generating embeddings for {len(chunks)} chunks (batch size {batch_size})...")
+
+        order = sorted(range(len(chunks)), key=lambda i: len(chunks[i]['text']))
+        groups = []
+        group, group_tokens = [], 0
+        for i in order:
+            tokens = len(chunks[i]['text']) // 4 + 1
+            if group and (len(group) >= batch_size or group_tokens + tokens > max_batch_tokens):
+                groups.append(group)
+                group, group_tokens = [], 0
+            group.append(i)
+            group_tokens += tokens
+        if group:
+            groups.append(group)
+
+        def embed_group(group):
+            texts = [chunks[i]['text'] for i in group]
+            try:
+                return self._embed_request(texts)
+            except Exception as e:
+                # Batch too large / timed out - fall back to one request per text
+                print(f"Batch of {len(texts)} failed ({e}), embedding one by one...")
+                return [self.embed(text) for text in texts]
+
+        if max_workers > 1 and len(groups) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as executor:
+                results = executor.map(embed_group, groups)  # yields in submission order
+                for group, embeddings in zip(groups, results):
+                    for i, embedding in zip(group, embeddings):
+                        chunks[i]['embedding'] = embedding
+        else:
+            for group in groups:
+                for i, embedding in zip(group, embed_group(group)):
+                    chunks[i]['embedding'] = embedding
+
+        print(" Embeddings generated successfully!")
+        return chunks
+
+class EmbeddingBatcher:
+    """
+    Micro-batcher for query embeddings
+
+    Why?
+    - Every /api/ask request embeds exactly one question
+    - Concurrent questions arriving within a few ms are sent to Ollama
+      as a single batched request instead of queueing one by one
+    - Runs on its own thread so callers never block the event loop
+    - Repeated questions are answered from an LRU cache without calling Ollama
+    """
+
+    def __init__(
+            self,
+            embedder: EmbeddingGenerator,
+            max_batch_size: int = 8,
+            max_wait_ms: float = 10,
+            cache_size: int = 1024
+    ):
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # sha256(model + text) -> float32 vector
+        self._cache_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue a text for embedding
+
+        Returns:
+            Future that resolves to the embedding vector
+        """
+        future = Future()
+        key = self._cache_key(text)
+
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            future.set_result(cached.tolist())
+            return future
+
+        self._queue.put((text, future))
+        return future
+
+    def _cache_key(self, text: str) -> bytes:
+        """Cache key includes the model name so switching models never serves stale vectors"""
+        return hashlib.sha256(f"{self.embedder.model_name}\0{text}".encode()).digest()
+
+    def _remember(self, text: str, embedding: List[float]):
+        """Store a vector (as compact float32) and evict the least recently used entry"""
+        if self.cache_size <= 0 or not any(embedding):
+            return  # never cache the zero vector returned on errors
+        with self._cache_lock:
+            self._cache[self._cache_key(text)] = np.asarray(embedding, dtype=np.float32)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _collect_batch(self) -> list:
+        """Block for the first item, then gather more until the batch is full or the window closes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = self.embedder.embed_many(texts)
+                for (text, future), embedding in zip(batch, embeddings):
+                    self._remember(text, embedding)
+                    future.set_result(embedding)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """
     Calculate similarity between two embeddings
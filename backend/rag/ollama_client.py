@@ -0,0 +1,28 @@
+"""
+Ollama Client Module - One shared HTTP client for every Ollama call
+
+Why?
+- The embedder and the LLM both talk to the same Ollama server
+- A single client keeps its TCP connections alive between calls instead of
+  setting one up per request, and caps how many are open at once
+- Pool limits should cover INGEST_PARALLEL_THREADS plus concurrent questions
+"""
+
+import os
+
+import httpx
+import ollama
+
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "64"))
+OLLAMA_MAX_KEEPALIVE = int(os.getenv("OLLAMA_MAX_KEEPALIVE", "32"))
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "300"))
+
+# host=None -> OLLAMA_HOST env var or the default localhost:11434
+client = ollama.Client(
+    host=os.getenv("OLLAMA_HOST"),
+    timeout=OLLAMA_TIMEOUT,
+    limits=httpx.Limits(
+        max_connections=OLLAMA_MAX_CONNECTIONS,
+        max_keepalive_connections=OLLAMA_MAX_KEEPALIVE
+    )
+)
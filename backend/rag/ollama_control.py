@@ -9,7 +9,11 @@ What does it do?
 """
 
 import ollama
-from typing import List, Dict 
+try:
+    from .ollama_client import client
+except ImportError:  # run as a script from rag/
+    from ollama_client import client
+from typing import List, Dict, Iterator 
 
 class OllamaLLM:
     """
@@ -47,7 +51,7 @@ class OllamaLLM:
             Generated text response
         """
         try:
-            response = ollama.generate(
+            response = client.generate(
                 model=self.model_name,
                 prompt=prompt,
                 stream=stream,
@@ -67,6 +71,29 @@ class OllamaLLM:
             print(f"Error generating response: {e}")
             return f"Error: Could not generate response. {str(e)}"
 
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Generate text using Ollama LLM, yielding it piece by piece as the
+        model produces it (first words arrive long before the full answer)
+
+        Args:
+            prompt: The complete prompt to send to LLM
+
+        Yields:
+            Response text fragments
+        """
+        for part in client.generate(
+            model=self.model_name,
+            prompt=prompt,
+            stream=True,
+            options={
+                'num_predict': 200,
+                'temperature': 0.3,
+            }
+        ):
+            if part['response']:
+                yield part['response']
+
     def construct_prompt(
             self,
             question: str, 
@@ -154,6 +181,14 @@ ANSWER (be accurate and provide relevant answer while still being brief):"""
             'num_context_chunks':len(context_chunks),
             'prompt':prompt # for debugging 
         }
+
+    def stream_answer(
+            self,
+            question: str,
+            context_chunks: List[str]
+    ) -> Iterator[str]:
+        """Streaming version of answer_question - yields the answer text as it is generated"""
+        return self.generate_stream(self.construct_prompt(question, context_chunks))
 def main():
     """ Test the file"""
 
@@ -7,7 +7,7 @@ Main Modue that ties everything toegether:
 -LLM
 """
 
-from typing import Dict, List 
+from typing import Dict, List, Iterator 
 from .embeddings import EmbeddingGenerator
 from .vector_store import VectorStore 
 from .ollama_control import OllamaLLM
@@ -22,7 +22,9 @@ class QueryProcessor:
             collection_name: str, 
             embedding_model: str ='nomic-embed-text', 
             llm_model: str='llama3.2',
-            chroma_persist_dir: str = "./chroma_db"
+            chroma_persist_dir: str = "./chroma_db",
+            embedder: EmbeddingGenerator = None,
+            chroma_client = None
 
     ):
         """
@@ -34,12 +36,14 @@ class QueryProcessor:
             embedding_model: Model for embeddings
             llm_model: Model for answer generation
             chroma_persist_dir: Where Chroma DB is stored
+            embedder: Optional - shared EmbeddingGenerator (else one is created)
+            chroma_client: Optional - shared chromadb client (else one is opened)
         """
         print("Initializing RAG pipline...")
 
         #Initlialization
-        self.embedder = EmbeddingGenerator(model_name=embedding_model)
-        self.vector_store = VectorStore(persist_directory=chroma_persist_dir)
+        self.embedder = embedder or EmbeddingGenerator(model_name=embedding_model)
+        self.vector_store = VectorStore(persist_directory=chroma_persist_dir, client=chroma_client)
         self.vector_store.create_collection(collection_name)
         self.llm = OllamaLLM(model_name=llm_model)
         print('RAG Pipline Ready')
@@ -49,7 +53,8 @@ class QueryProcessor:
             question: str, 
             top_k: int =5,
             include_metadata: bool = True,
-            filename_filter: str = None
+            filename_filter: str = None,
+            question_embedding: List[float] = None
     )-> Dict:
         """
          Complete RAG pipeline: Question -> Answer
@@ -68,6 +73,7 @@ class QueryProcessor:
             top_k: How many context chunks to retrieve
             include_metadata: Whether to include debug info
             filename_filter: Optional - filter results by specific filename
+            question_embedding: Optional - precomputed embedding (skips step 1)
         
         Returns:
             Dict with answer and metadata
@@ -78,7 +84,8 @@ class QueryProcessor:
         
         #Step 1: Embed the Model 
         print('\n[1/4] Embedding Question...')
-        question_embedding = self.embedder.embed(question)
+        if question_embedding is None:
+            question_embedding = self.embedder.embed(question)
         print(f"       Generated {len(question_embedding)}-dim embedding")
         
         #Step 2: Search Vector Store
@@ -140,6 +147,41 @@ class QueryProcessor:
         print("     Done \n")
         return response 
     
+    def stream_query(
+            self,
+            question: str,
+            top_k: int = 5,
+            filename_filter: str = None,
+            question_embedding: List[float] = None
+    ) -> Iterator[str]:
+        """
+        Same pipeline as process_query, but yields the answer text as the LLM
+        generates it instead of returning it once complete
+
+        Args:
+            question: User's question
+            top_k: How many context chunks to retrieve
+            filename_filter: Optional - filter results by specific filename
+            question_embedding: Optional - precomputed embedding
+
+        Yields:
+            Answer text fragments
+        """
+        if question_embedding is None:
+            question_embedding = self.embedder.embed(question)
+
+        search_results = self.vector_store.search(
+            query_embedding=question_embedding,
+            top_k=top_k,
+            where_filter={"filename": filename_filter} if filename_filter else None
+        )
+        documents = search_results['documents']
+        if not documents:
+            yield "I couldn't find any relevant data to answer this question."
+            return
+
+        yield from self.llm.stream_answer(question=question, context_chunks=documents)
+
     def get_stats(self) -> Dict:
         """Get statistics about the current collection"""
         return self.vector_store.get_collection_stats()
@@ -16,13 +16,18 @@ class VectorStore:
     Manages storage and retrieval of embeddings 
     """
 
-    def __init__(self, persist_directory: str = "./chroma_db"): 
+    def __init__(self, persist_directory: str = "./chroma_db", client=None): 
         """
         Initialize chroma database 
         
         Args:
             persist_directory: Where to save the database on disk 
+            client: Optional - an already open chromadb client to share
+                    (skips opening the database again)
         """
+        if client is not None:
+            self.client = client
+            return
 
         os.makedirs(persist_directory, exist_ok=True) # Create Directory if it doesn't exist 
         self.client = chromadb.PersistentClient(path = persist_directory)
@@ -51,33 +56,66 @@ class VectorStore:
         print(f" Collection {collection_name} is ready")
         return self.collection 
     
-    def add_chunks(self, chunks: List[Dict]):
+    def add_chunks(self, chunks: List[Dict], collection=None):
         """
         Add chunks with embeddings to the database
         
         Args:
             chunks: List of dicts with 'text', 'embedding', and 'metadata'
+            collection: Optional - collection to add to (default: the one
+                        selected by create_collection())
         """
-        if not hasattr(self, 'collection'):
-            raise ValueError("No collection selected. Call create_collection() first. ")
+        if collection is None:
+            if not hasattr(self, 'collection'):
+                raise ValueError("No collection selected. Call create_collection() first. ")
+            collection = self.collection
         
         # Extract date from chunks 
         ids=[chunk['metadata']['chunk_id'] for chunk in chunks]
         embeddings = [chunk['embedding'] for chunk in chunks]
         documents = [chunk['text'] for chunk in chunks]
-        metadatas = [chunk['metadata'] for chunk in chunks]
-
-        #Remove 'embeddings' from metadata since its stored separately 
-        for metadata in metadatas: 
-            if 'embedding' in metadata: 
-                del metadata['embedding']
-        self.collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            documents=documents,
-            metadatas=metadatas
-        )
-        print(f' Added {len(chunks)} chunks to collection {self.collection.name}')
+        #Leave out 'embedding' from metadata since its stored separately 
+        metadatas = [
+            {k: v for k, v in chunk['metadata'].items() if k != 'embedding'}
+            for chunk in chunks
+        ]
+
+        # One add() per max-size batch (a single call for normal uploads);
+        # Chroma rejects calls above its max batch size
+        batch_size = self.max_batch_size()
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            collection.add(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end]
+            )
+        print(f' Added {len(chunks)} chunks to collection {collection.name}')
+
+    def delete_chunks(self, where_filter: Dict, collection=None):
+        """
+        Delete every chunk whose metadata matches where_filter
+
+        Args:
+            where_filter: Metadata filter (e.g., {"file_id": "data_20250101_120000.csv"})
+            collection: Optional - collection to delete from (default: the one
+                        selected by create_collection())
+        """
+        if collection is None:
+            if not hasattr(self, 'collection'):
+                raise ValueError("No collection selected. Call create_collection() first. ")
+            collection = self.collection
+        collection.delete(where=where_filter)
+
+    def max_batch_size(self) -> int:
+        """Largest number of records Chroma accepts in one add() call"""
+        if not hasattr(self, '_max_batch_size'):
+            try:
+                self._max_batch_size = self.client.get_max_batch_size()
+            except AttributeError:  # older chromadb
+                self._max_batch_size = getattr(self.client, 'max_batch_size', 5461)
+        return self._max_batch_size
 
     def search(self, query_embedding: List[float], top_k: int =5, where_filter: Dict = None)->Dict: 
         """
@@ -4,6 +4,7 @@ Test File Upload Endpoint with RAG Integration
 
 import requests
 import json
+import time
 from datetime import datetime
 
 BASE_URL = "http://localhost:5001/api"
@@ -92,8 +93,9 @@ def upload_csv_file(cookies):
                 cookies=cookies
             )
         
-        if response.status_code == 201:
-            print_success(f"Upload successful! Status Code: {response.status_code}")
+        # 202: the file is saved and queued, processing runs in the background
+        if response.status_code == 202:
+            print_success(f"Upload accepted! Status Code: {response.status_code}")
             result = response.json()
             pretty_print_json(result)
             return result.get('file', {}).get('file_id')
@@ -106,9 +108,34 @@ def upload_csv_file(cookies):
         print_error(f"Upload error: {e}")
         return None
 
+def wait_for_processing(cookies, file_id, timeout=600, interval=2):
+    """Poll the file until its status is 'ready' or 'failed'"""
+    print_header(f"Step 3: Wait for Processing (ID: {file_id})")
+    
+    deadline = time.monotonic() + timeout
+    while True:
+        response = requests.get(f"{BASE_URL}/files/{file_id}", cookies=cookies)
+        if response.status_code != 200:
+            print_error(f"Failed to get file status: {response.status_code}")
+            return False
+        
+        file_info = response.json()['file']
+        if file_info['status'] == 'ready':
+            print_success(f"Processed: {file_info['num_rows']} rows, {file_info['num_chunks']} chunks")
+            return True
+        if file_info['status'] == 'failed':
+            print_error("Processing failed")
+            return False
+        if time.monotonic() >= deadline:
+            print_error(f"Still pending after {timeout}s")
+            return False
+        
+        print_info("Still processing...")
+        time.sleep(interval)
+
 def get_files(cookies):
     """Get list of uploaded files"""
-    print_header("Step 3: Get Uploaded Files")
+    print_header("Step 4: Get Uploaded Files")
     
     print_info("Fetching file list...")
     
@@ -133,7 +160,7 @@ def get_files(cookies):
 
 def get_file_details(cookies, file_id):
     """Get details of a specific file"""
-    print_header(f"Step 4: Get File Details (ID: {file_id})")
+    print_header(f"Step 5: Get File Details (ID: {file_id})")
     
     print_info(f"Fetching details for file ID: {file_id}")
     
@@ -176,10 +203,15 @@ def main():
         print_error("File upload failed")
         return
     
-    # Step 3: Get all files
+    # Step 3: Wait for the background processing
+    if not wait_for_processing(cookies, file_id):
+        print_error("File processing failed")
+        return
+    
+    # Step 4: Get all files
     get_files(cookies)
     
-    # Step 4: Get specific file details
+    # Step 5: Get specific file details
     get_file_details(cookies, file_id)
     
     # Summary
@@ -0,0 +1,31 @@
+"""
+Shared pytest setup - run from backend/:
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+# Tests import the backend modules the way app.py does (db.pool, parsers.*, rag.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import pytest
+
+
+class WhitespaceEncoding:
+    """Stand-in for a tiktoken encoding (its BPE files are downloaded on first use)"""
+
+    def encode(self, text):
+        return text.split()
+
+    def encode_ordinary_batch(self, texts, num_threads=1):
+        return [text.split() for text in texts]
+
+
+@pytest.fixture
+def offline_tokenizer(monkeypatch):
+    """Count tokens without fetching tiktoken's encoding files"""
+    from rag import chunking_module
+    monkeypatch.setattr(chunking_module, "get_encoding", lambda model="gpt-3.5-turbo": WhitespaceEncoding())
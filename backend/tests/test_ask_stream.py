@@ -0,0 +1,70 @@
+"""/api/ask/stream: errors before and during the streamed answer"""
+
+import asyncio
+from concurrent.futures import Future
+
+import pytest
+from fastapi import HTTPException
+
+import app
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.rows = []
+
+    def submit(self, row):
+        self.rows.append(row)
+
+
+def failing_answer():
+    yield "Alice is"
+    yield " 25"
+    raise ConnectionError("ollama went away")
+
+
+def test_stream_error_becomes_last_fragment_and_is_recorded(monkeypatch):
+    writer = RecordingWriter()
+    monkeypatch.setattr(app, "chat_writer", writer)
+
+    sent = list(app.record_answer_stream(failing_answer(), "ann", 3, "How old is Alice?"))
+
+    assert sent[:2] == ["Alice is", " 25"]
+    assert sent[2] == "\n\nError: Could not generate response. ollama went away"
+    [(username, file_id, question, answer, _)] = writer.rows
+    assert (username, file_id, question) == ("ann", 3, "How old is Alice?")
+    assert answer == "".join(sent).strip()
+
+
+def test_stream_records_complete_answer(monkeypatch):
+    writer = RecordingWriter()
+    monkeypatch.setattr(app, "chat_writer", writer)
+
+    sent = list(app.record_answer_stream(iter(["Bob ", "is 30 "]), "ann", None, "Bob?"))
+
+    assert sent == ["Bob ", "is 30 "]
+    assert writer.rows[0][3] == "Bob is 30"
+
+
+def test_failure_before_streaming_is_a_500(monkeypatch):
+    async def filename(username, file_id):
+        return "people.csv"
+
+    def no_chroma(collection_name):
+        raise RuntimeError("chroma is down")
+
+    class Batcher:
+        def submit(self, text):
+            future = Future()
+            future.set_result([0.0])
+            return future
+
+    monkeypatch.setattr(app, "ask_filename", filename)
+    monkeypatch.setattr(app, "get_embedding_batcher", Batcher)
+    monkeypatch.setattr(app, "get_query_processor", no_chroma)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(app.ask_question_stream(app.QuestionRequest(question="Bob?"), username="ann"))
+
+    assert raised.value.status_code == 500
+    assert "chroma is down" in raised.value.detail
@@ -0,0 +1,125 @@
+"""Login throttling, token verification and password rehash checks in app"""
+
+import time
+
+import bcrypt
+from argon2 import PasswordHasher
+from werkzeug.security import generate_password_hash
+
+import app
+
+
+class FakeClock:
+    """Stands in for the time module - monotonic() and time() move together"""
+
+    def __init__(self):
+        self.now = time.time()  # real wall time, so PyJWT accepts fresh tokens
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def fake_clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(app, "time", clock)
+    return clock
+
+
+def test_ip_bucket_empties_and_refills(monkeypatch):
+    clock = fake_clock(monkeypatch)
+    throttle = app.LoginThrottle(rate_per_minute=6, burst=2)
+
+    assert throttle.allow_ip("1.2.3.4") and throttle.allow_ip("1.2.3.4")
+    assert not throttle.allow_ip("1.2.3.4")
+    assert throttle.allow_ip("5.6.7.8")  # buckets are per IP
+
+    clock.advance(10)  # 6/min -> one token back
+    assert throttle.allow_ip("1.2.3.4")
+    assert not throttle.allow_ip("1.2.3.4")
+
+
+def test_username_locks_after_failures_until_window_ends(monkeypatch):
+    clock = fake_clock(monkeypatch)
+    throttle = app.LoginThrottle(max_failures=3, lockout_s=300)
+
+    for _ in range(2):
+        throttle.record_failure("ann")
+    assert not throttle.is_locked("ann")
+    throttle.record_failure("ann")
+    assert throttle.is_locked("ann")
+
+    clock.advance(300)
+    assert not throttle.is_locked("ann")
+
+
+def test_success_clears_failures(monkeypatch):
+    fake_clock(monkeypatch)
+    throttle = app.LoginThrottle(max_failures=2)
+
+    throttle.record_failure("ann")
+    throttle.record_success("ann")
+    throttle.record_failure("ann")
+    assert not throttle.is_locked("ann")
+
+
+def test_cached_token_still_expires(monkeypatch):
+    clock = fake_clock(monkeypatch)
+    token = app.create_access_token({"sub": "ann"})
+
+    assert app.verify_token(token) == "ann"
+    hits = app._decode.cache_info().hits
+
+    clock.advance(app.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    assert app.verify_token(token) is None
+    assert app._decode.cache_info().hits == hits + 1  # rejected on the cache hit
+
+
+def test_revoked_token_is_rejected_despite_cache(monkeypatch):
+    fake_clock(monkeypatch)
+    monkeypatch.setattr(app, "REVOKED_TOKENS", {})
+    token = app.create_access_token({"sub": "bo"})
+    assert app.verify_token(token) == "bo"
+
+    app.revoke_token(token)
+
+    assert app.verify_token(token) is None
+
+
+def test_tampered_token_does_not_verify():
+    token = app.create_access_token({"sub": "ann"})
+
+    assert app.verify_token(token[:-2] + ("AA" if token[-2:] != "AA" else "BB")) is None
+
+
+def test_legacy_werkzeug_hash_needs_rehash():
+    assert app.password_needs_rehash(generate_password_hash("pw", method="pbkdf2:sha256"))
+
+
+def test_rehash_when_scheme_changes(monkeypatch):
+    monkeypatch.setattr(app, "BCRYPT_ROUNDS", 4)
+    bcrypt_hash = bcrypt.hashpw(b"pw", bcrypt.gensalt(rounds=4)).decode()
+    argon2_hash = app.argon2_hasher.hash("pw")
+
+    monkeypatch.setattr(app, "PASSWORD_HASH_SCHEME", "argon2")
+    assert app.password_needs_rehash(bcrypt_hash)
+    assert not app.password_needs_rehash(argon2_hash)
+
+    monkeypatch.setattr(app, "PASSWORD_HASH_SCHEME", "bcrypt")
+    assert app.password_needs_rehash(argon2_hash)
+    assert not app.password_needs_rehash(bcrypt_hash)
+
+
+def test_rehash_when_parameters_change(monkeypatch):
+    monkeypatch.setattr(app, "PASSWORD_HASH_SCHEME", "bcrypt")
+    monkeypatch.setattr(app, "BCRYPT_ROUNDS", 5)
+    assert app.password_needs_rehash(bcrypt.hashpw(b"pw", bcrypt.gensalt(rounds=4)).decode())
+
+    monkeypatch.setattr(app, "PASSWORD_HASH_SCHEME", "argon2")
+    weaker = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1).hash("pw")
+    assert app.password_needs_rehash(weaker)
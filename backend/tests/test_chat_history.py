@@ -0,0 +1,53 @@
+"""/api/ask/history: newest first, offset and keyset pages"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+import app
+from db.pool import close_pool, init_pool
+
+
+@pytest.fixture
+def history(tmp_path):
+    db_path = str(tmp_path / "users.db")
+    app.init_db(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(app.SQL_INSERT_CHAT, [
+            ("ann", None, "q1", "a1", "2024-01-01 10:00:00"),
+            ("ann", None, "q2", "a2", "2024-01-01 11:00:00"),
+            ("ann", None, "q3", "a3", "2024-01-01 11:00:00"),  # same second as q2
+            ("bo", None, "other", "x", "2024-01-01 12:00:00"),
+            ("ann", None, "q4", "a4", "2024-01-01 12:00:00"),
+        ])
+    init_pool(db_path, size=1)
+    yield
+    close_pool()
+
+
+def page(**params):
+    params = {"limit": 50, "offset": 0, "before_ts": None, "before_id": None, **params}
+    return asyncio.run(app.get_chat_history(username="ann", **params))
+
+
+def questions(result):
+    return [item["question"] for item in result["history"]]
+
+
+def test_newest_first_with_id_breaking_ties(history):
+    result = page()
+
+    assert questions(result) == ["q4", "q3", "q2", "q1"]
+    assert result["count"] == 4
+    assert set(result["history"][0]) == {"id", "question", "answer", "timestamp", "file_id"}
+
+
+def test_offset_and_keyset_pages_agree(history):
+    first = page(limit=2)
+    last = first["history"][-1]
+
+    by_key = page(limit=2, before_ts=last["timestamp"], before_id=last["id"])
+
+    assert questions(first) == ["q4", "q3"]
+    assert questions(by_key) == questions(page(limit=2, offset=2)) == ["q2", "q1"]
@@ -0,0 +1,56 @@
+"""Chunk text built by rag.chunking_module"""
+
+import numpy as np
+import pandas as pd
+
+from parsers.parser_utils import standardize_dataframe
+from rag.chunking_module import dataframe_to_chunks, row_to_text, rows_to_texts
+
+
+def per_row_texts(df):
+    return [row_to_text(row) for _, row in df.iterrows()]
+
+
+def mixed_frame():
+    return pd.DataFrame({
+        'joined': pd.to_datetime(['2024-01-05', '2024-02-01 10:30', None], format='ISO8601'),
+        'score': [1.5, np.nan, 2.0],
+        'name': ['Alice', None, 'Carl'],
+        'age': [25, 30, 35],
+        'active': [True, False, True],
+    })
+
+
+def test_rows_to_texts_matches_row_to_text_on_mixed_dtypes():
+    df = standardize_dataframe(mixed_frame(), 'people.csv', 'csv')
+
+    texts = rows_to_texts(df)
+
+    assert texts == per_row_texts(df)
+    # Midnight timestamps keep their time, missing values read 'nan' / 'NaT'
+    assert texts[0].startswith('joined: 2024-01-05 00:00:00, score: 1.5, name: Alice')
+    assert 'score: nan, name: nan' in texts[1]
+
+
+def test_rows_to_texts_matches_row_to_text_when_iterrows_upcasts():
+    # No text column: iterrows() turns the ints into floats
+    df = pd.DataFrame({'age': [25, 30], 'score': [1.5, np.nan]})
+
+    assert rows_to_texts(df) == per_row_texts(df) == ['age: 25.0, score: 1.5', 'age: 30.0, score: nan']
+
+
+def test_rows_to_texts_without_data_columns():
+    df = pd.DataFrame({'source_file': ['empty.csv'] * 2, 'content_type': ['csv'] * 2, 'row_index': [0, 1]})
+
+    assert rows_to_texts(df) == ['', '']
+
+
+def test_dataframe_to_chunks_metadata(offline_tokenizer):
+    df = standardize_dataframe(mixed_frame(), 'people.csv', 'csv')
+
+    chunks = dataframe_to_chunks(df)
+
+    assert [chunk['text'] for chunk in chunks] == per_row_texts(df)
+    assert [chunk['metadata']['chunk_id'] for chunk in chunks] == ['people.csv_0', 'people.csv_1', 'people.csv_2']
+    assert chunks[0]['metadata']['content_type'] == 'csv'
+    assert chunks[0]['metadata']['token_count'] == len(chunks[0]['text'].split())
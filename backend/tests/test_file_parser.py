@@ -0,0 +1,34 @@
+"""Routing and batch parsing in parsers.file_parser"""
+
+import pytest
+
+from parsers.file_parser import parse_files
+
+
+def write_csv(tmp_path, name, rows):
+    path = tmp_path / name
+    path.write_text("name\n" + "".join(f"{row}\n" for row in rows))
+    return str(path)
+
+
+def test_parse_files_keeps_file_order(tmp_path):
+    paths = [
+        write_csv(tmp_path, "a.csv", ["Ann", "Al"]),
+        write_csv(tmp_path, "b.csv", ["Bo"]),
+        write_csv(tmp_path, "c.csv", ["Cy", "Cal"]),
+    ]
+
+    df = parse_files(paths, max_workers=2)
+
+    assert df['source_file'].tolist() == ['a.csv', 'a.csv', 'b.csv', 'c.csv', 'c.csv']
+    assert df['name'].tolist() == ['Ann', 'Al', 'Bo', 'Cy', 'Cal']
+    assert df['row_index'].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_parse_files_raises_for_a_failing_file(tmp_path):
+    good = write_csv(tmp_path, "a.csv", ["Ann"])
+
+    with pytest.raises(FileNotFoundError):
+        parse_files([good, str(tmp_path / "missing.csv")], max_workers=2)
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        parse_files([good, write_csv(tmp_path, "notes.txt", ["x"])], max_workers=2)
@@ -0,0 +1,47 @@
+"""Calendar parsing in parsers.ical_parser"""
+
+from parsers.ical_parser import parse_ical_file
+
+
+CALENDAR = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "PRODID:-//test//EN\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:1@test\r\n"
+    "SUMMARY:Standup\r\n"
+    "DTSTART:20240105T090000Z\r\n"
+    "DTEND:20240105T093000Z\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+def write_ics(tmp_path, text):
+    path = tmp_path / "cal.ics"
+    path.write_text(text, newline="")
+    return str(path)
+
+
+def test_parses_event(tmp_path):
+    df = parse_ical_file(write_ics(tmp_path, CALENDAR))
+
+    assert df['summary'].tolist() == ['Standup']
+    assert df['duration_hours'].tolist() == [0.5]
+
+
+def test_lowercase_property_names_still_parse(tmp_path):
+    # begin:vevent, summary:... - icalendar reads names in any case
+    lowercase = "".join(
+        f"{name.lower()}:{value}" for name, value in
+        (line.split(":", 1) for line in CALENDAR.splitlines(keepends=True))
+    )
+    df = parse_ical_file(write_ics(tmp_path, lowercase))
+
+    assert df['summary'].tolist() == ['Standup']
+
+
+def test_calendar_without_events_is_empty(tmp_path):
+    no_events = CALENDAR.replace("BEGIN:VEVENT", "BEGIN:VTODO").replace("END:VEVENT", "END:VTODO")
+
+    assert parse_ical_file(write_ics(tmp_path, no_events)).empty
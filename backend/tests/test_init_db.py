@@ -0,0 +1,98 @@
+"""init_db: migrations from older schemas and concurrent startup"""
+
+import sqlite3
+import threading
+
+import pytest
+
+import app
+
+
+def columns(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def user_version(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_fresh_database_gets_current_schema(tmp_path):
+    db_path = str(tmp_path / "users.db")
+    app.init_db(db_path)
+
+    assert user_version(db_path) == app.SCHEMA_VERSION
+    assert {"num_chunks", "status", "content_hash", "file_size"} <= columns(db_path, "files")
+
+
+def test_migrates_v1_database_and_keeps_rows(tmp_path):
+    db_path = str(tmp_path / "users.db")
+    upload = tmp_path / "data.csv"
+    upload.write_bytes(b"a,b\n1,2\n")
+
+    # A database as written by the v1 schema
+    conn = sqlite3.connect(db_path)
+    app._schema_v1(conn.cursor())
+    conn.execute("INSERT INTO users (username, fullname, email, password) VALUES ('bob', 'Bob', 'b@x.io', 'h')")
+    conn.execute(
+        "INSERT INTO files (username, filename, original_filename, file_type, file_path) "
+        "VALUES ('bob', 'data_1.csv', 'data.csv', 'csv', ?)", (str(upload),)
+    )
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    app.init_db(db_path)
+
+    assert user_version(db_path) == app.SCHEMA_VERSION
+    with sqlite3.connect(db_path) as conn:
+        status, file_size = conn.execute("SELECT status, file_size FROM files").fetchone()
+    assert status == "ready"  # rows from before v3 were processed inline
+    assert file_size == upload.stat().st_size
+
+
+def test_failed_step_rolls_back_and_is_retried(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "users.db")
+
+    def broken_v5(c):
+        app._schema_v5(c)
+        raise RuntimeError("crash mid-migration")
+
+    steps = dict(app.SCHEMA_STEPS)
+    steps[5] = broken_v5
+    monkeypatch.setattr(app, "SCHEMA_STEPS", sorted(steps.items()))
+    with pytest.raises(RuntimeError):
+        app.init_db(db_path)
+
+    # Steps before the crash are committed, the crashed one left no trace
+    assert user_version(db_path) == 4
+    assert "file_size" not in columns(db_path, "files")
+
+    monkeypatch.undo()
+    app.init_db(db_path)
+    assert user_version(db_path) == app.SCHEMA_VERSION
+    assert "file_size" in columns(db_path, "files")
+
+
+def test_concurrent_init_runs_each_migration_once(tmp_path):
+    db_path = str(tmp_path / "users.db")
+    workers = 6
+    barrier = threading.Barrier(workers)
+    errors = []
+
+    def start_worker():
+        barrier.wait()
+        try:
+            app.init_db(db_path)
+        except Exception as e:  # e.g. "duplicate column name"
+            errors.append(e)
+
+    threads = [threading.Thread(target=start_worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert user_version(db_path) == app.SCHEMA_VERSION
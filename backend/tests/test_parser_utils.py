@@ -0,0 +1,31 @@
+"""Standardization helpers in parsers.parser_utils"""
+
+import pandas as pd
+import pytest
+
+from parsers.parser_utils import merge_dataframes, standardize_dataframe
+
+
+def test_merge_dataframes_renumbers_rows():
+    a = standardize_dataframe(pd.DataFrame({'x': [1, 2]}), 'a.csv', 'csv')
+    b = standardize_dataframe(pd.DataFrame({'x': [3]}), 'b.csv', 'csv')
+
+    merged = merge_dataframes([a, b])
+
+    assert merged['row_index'].tolist() == [0, 1, 2]
+    assert merged['source_file'].tolist() == ['a.csv', 'a.csv', 'b.csv']
+
+
+def test_merge_dataframes_validates_by_default():
+    raw = pd.DataFrame({'x': [1]})
+
+    with pytest.raises(ValueError, match="Missing required columns"):
+        merge_dataframes([raw])
+    assert len(merge_dataframes([raw], validate=False)) == 1
+
+
+def test_standardize_dataframe_rejects_metadata_column_names():
+    df = pd.DataFrame({'name': ['Ann'], 'row_index': [7]})
+
+    with pytest.raises(ValueError, match=r"reserved metadata columns: \['row_index'\]"):
+        standardize_dataframe(df, 'a.csv', 'csv')
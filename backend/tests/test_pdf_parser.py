@@ -0,0 +1,44 @@
+"""Batch PDF parsing in parsers.pdf_parser"""
+
+from parsers.pdf_parser import parse_pdfs_batch
+
+
+def minimal_pdf(text):
+    """One-page PDF showing text in Helvetica"""
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (num, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def test_parse_pdfs_batch_keeps_order_and_isolates_failures(tmp_path):
+    paths = []
+    for name, content in [("one.pdf", minimal_pdf("First report")),
+                          ("broken.pdf", b"not a pdf"),
+                          ("two.pdf", minimal_pdf("Second report"))]:
+        path = tmp_path / name
+        path.write_bytes(content)
+        paths.append(str(path))
+
+    first, broken, second = parse_pdfs_batch(paths, workers=2)
+
+    assert "First report" in first['text']
+    assert first['metadata']['file_name'] == 'one.pdf'
+    assert broken['text'] == '' and 'error' in broken['metadata']
+    assert "Second report" in second['text']
+    assert second['metadata']['num_pages'] == 1
@@ -0,0 +1,56 @@
+"""db.pool.ConnectionPool: read/write split and clean hand-back"""
+
+import queue
+import sqlite3
+
+import pytest
+
+from db.pool import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    db_path = str(tmp_path / "pool.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE items (name TEXT)")
+    pool = ConnectionPool(db_path, size=2)
+    yield pool
+    pool.close()
+
+
+def count_items(pool):
+    with pool.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+
+def test_readers_are_query_only(pool):
+    with pool.connection() as conn:
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            conn.execute("INSERT INTO items VALUES ('x')")
+
+
+def test_writer_commits_and_readers_see_it(pool):
+    with pool.connection(write=True) as conn, conn:
+        conn.execute("INSERT INTO items VALUES ('x')")
+
+    assert count_items(pool) == 1
+
+
+def test_single_writer_is_exclusive(pool):
+    with pool.connection(write=True):
+        with pytest.raises(queue.Empty):
+            with pool.connection(write=True, timeout=0.05):
+                pass
+        # Readers are a separate queue and stay available
+        assert count_items(pool) == 0
+
+
+def test_unfinished_transaction_is_rolled_back_on_return(pool):
+    with pytest.raises(RuntimeError):
+        with pool.connection(write=True) as conn:
+            conn.execute("INSERT INTO items VALUES ('x')")
+            raise RuntimeError("handler failed before commit")
+
+    with pool.connection(write=True) as conn:
+        assert not conn.in_transaction
+    assert count_items(pool) == 0
@@ -0,0 +1,133 @@
+"""process_file: pending upload -> 'ready' with counts, or 'failed'"""
+
+import sqlite3
+
+import pytest
+
+import app
+from db.pool import close_pool, init_pool
+
+
+class StubEmbedder:
+    def embed_chunks_batched(self, chunks, **kwargs):
+        return [{**chunk, 'embedding': [0.0, 1.0]} for chunk in chunks]
+
+
+class StubVectorStore:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.added = []
+
+    def create_collection(self, name):
+        return name
+
+    def add_chunks(self, chunks, collection=None):
+        if self.fail:
+            raise RuntimeError("chroma is down")
+        self.added.extend(chunks)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "users.db")
+    app.init_db(path)
+    with sqlite3.connect(path) as conn:
+        conn.execute(app.SQL_INSERT_USER, ("Ann", "ann", "ann@example.com", "x"))
+    init_pool(path, size=1)
+    yield path
+    close_pool()
+
+
+def pending_upload(db_path, tmp_path, name, content):
+    file_path = tmp_path / name
+    file_path.write_text(content)
+    with sqlite3.connect(db_path) as conn:
+        file_id = conn.execute(app.SQL_INSERT_FILE, (
+            "ann", name, name, name.rsplit(".", 1)[1], str(file_path),
+            "2024-01-01 00:00:00", "user_ann_files", "0" * 64, len(content)
+        )).lastrowid
+    return file_id, file_path
+
+
+def file_row(db_path, file_id):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            "SELECT status, num_rows, num_columns, num_chunks FROM files WHERE file_id = ?",
+            (file_id,)
+        ).fetchone()
+
+
+def run(file_id, file_path):
+    name = file_path.name
+    app.process_file(file_id, str(file_path), name, name, name.rsplit(".", 1)[1], "user_ann_files")
+
+
+def test_marks_file_ready_with_counts(db_path, tmp_path, monkeypatch, offline_tokenizer):
+    store = StubVectorStore()
+    monkeypatch.setattr(app, "get_embedding_generator", StubEmbedder)
+    monkeypatch.setattr(app, "get_vector_store", lambda: store)
+    file_id, file_path = pending_upload(db_path, tmp_path, "people.csv", "name,age\nAnn,25\nBo,30\n")
+
+    run(file_id, file_path)
+
+    assert file_row(db_path, file_id) == ("ready", 2, 2, 2)
+    assert [chunk['metadata']['filename'] for chunk in store.added] == ["people.csv"] * 2
+    assert file_path.exists()
+
+
+def test_marks_file_failed_and_removes_upload(db_path, tmp_path, monkeypatch, offline_tokenizer):
+    monkeypatch.setattr(app, "get_embedding_generator", StubEmbedder)
+    monkeypatch.setattr(app, "get_vector_store", lambda: StubVectorStore(fail=True))
+    file_id, file_path = pending_upload(db_path, tmp_path, "people.csv", "name,age\nAnn,25\n")
+
+    run(file_id, file_path)
+
+    assert file_row(db_path, file_id)[0] == "failed"
+    assert not file_path.exists()
+
+
+def test_empty_file_fails(db_path, tmp_path, monkeypatch, offline_tokenizer):
+    monkeypatch.setattr(app, "get_embedding_generator", StubEmbedder)
+    monkeypatch.setattr(app, "get_vector_store", StubVectorStore)
+    file_id, file_path = pending_upload(db_path, tmp_path, "empty.csv", "name,age\n")
+
+    run(file_id, file_path)
+
+    assert file_row(db_path, file_id)[0] == "failed"
+
+
+def status(db_path, file_id):
+    return file_row(db_path, file_id)[0]
+
+
+def test_interrupted_uploads_are_failed_at_startup(db_path, tmp_path):
+    stuck, stuck_path = pending_upload(db_path, tmp_path, "stuck.csv", "name\nAnn\n")
+    done, done_path = pending_upload(db_path, tmp_path, "done.csv", "name\nBo\n")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(app.SQL_FILE_READY, (1, 1, 1, done))
+
+    assert app.fail_interrupted_ingests(db_path) == 1
+
+    assert (status(db_path, stuck), status(db_path, done)) == ("failed", "ready")
+    assert not stuck_path.exists() and done_path.exists()
+
+
+def test_shutdown_only_fails_this_process_jobs(db_path, tmp_path):
+    mine, _ = pending_upload(db_path, tmp_path, "mine.csv", "name\nAnn\n")
+    other, other_path = pending_upload(db_path, tmp_path, "other.csv", "name\nBo\n")
+
+    assert app.fail_interrupted_ingests(db_path, file_ids={mine}) == 1
+
+    assert (status(db_path, mine), status(db_path, other)) == ("failed", "pending")
+    assert other_path.exists()
+
+
+def test_finished_job_leaves_inflight_set(db_path, tmp_path, monkeypatch, offline_tokenizer):
+    monkeypatch.setattr(app, "get_embedding_generator", StubEmbedder)
+    monkeypatch.setattr(app, "get_vector_store", StubVectorStore)
+    file_id, file_path = pending_upload(db_path, tmp_path, "people.csv", "name\nAnn\n")
+    app.inflight_ingests.add(file_id)
+
+    run(file_id, file_path)
+
+    assert file_id not in app.inflight_ingests
@@ -0,0 +1,40 @@
+"""Streamed row chunks (stream_rows + rows_to_chunks) vs the DataFrame path"""
+
+from parsers.file_parser import parse_file, stream_rows
+from parsers.parser_utils import detect_content_type
+from rag.chunking_module import dataframe_to_chunks, rows_to_chunks
+
+
+CSV_TEXT = (
+    "\ufeffname,city,age,note\n"
+    "Alice,NYC,25,first\n"
+    "Bob,,30,NA\n"
+    "Carl,Chicago,35\n"
+)
+
+
+def test_csv_stream_chunks_match_dataframe_chunks(tmp_path, offline_tokenizer):
+    path = tmp_path / "people.csv"
+    path.write_text(CSV_TEXT, encoding="utf-8")
+
+    streamed = rows_to_chunks(stream_rows(str(path)), "people.csv", "csv")
+    parsed = dataframe_to_chunks(parse_file(str(path)))
+
+    assert streamed == parsed
+    # BOM is not part of the first header, blanks / NA / short rows read 'nan'
+    assert streamed[0]["text"] == "name: Alice, city: NYC, age: 25, note: first"
+    assert streamed[1]["text"] == "name: Bob, city: nan, age: 30, note: nan"
+    assert streamed[2]["text"] == "name: Carl, city: Chicago, age: 35, note: nan"
+
+
+def test_ndjson_stream_chunks_match_dataframe_chunks(tmp_path, offline_tokenizer):
+    path = tmp_path / "events.ndjson"
+    path.write_text('{"event": "login", "user": "ann"}\n\n{"event": "logout", "user": "bo"}\n')
+
+    # process_file tags streamed chunks the way the parser tags the frame
+    content_type = detect_content_type(str(path))
+    streamed = rows_to_chunks(stream_rows(str(path)), path.name, content_type)
+    parsed = dataframe_to_chunks(parse_file(str(path)))
+
+    assert content_type == "json"
+    assert streamed == parsed
@@ -0,0 +1,75 @@
+"""upload_file: saving, registering and de-duplicating uploads"""
+
+import asyncio
+import io
+import sqlite3
+
+import pytest
+from fastapi import UploadFile
+from fastapi.responses import Response
+
+import app
+from db.pool import close_pool, init_pool
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    """Empty database + upload folder; queued ingests are recorded, not run"""
+    db_path = str(tmp_path / "users.db")
+    app.init_db(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(app.SQL_INSERT_USER, ("Ann", "ann", "ann@example.com", "x"))
+    init_pool(db_path, size=1)
+    folder = tmp_path / "uploads"
+    folder.mkdir()
+    monkeypatch.setattr(app, "UPLOAD_FOLDER", str(folder))
+    queued = []
+    monkeypatch.setattr(app.ingest_executor, "submit", lambda fn, file_id, *args: queued.append(file_id))
+    yield db_path, folder, queued
+    close_pool()
+
+
+def upload(name, content, username="ann"):
+    response = Response()
+    body = asyncio.run(app.upload_file(
+        response, file=UploadFile(io.BytesIO(content), filename=name), username=username
+    ))
+    return response.status_code, body
+
+
+def test_same_content_returns_existing_file(uploads):
+    db_path, folder, queued = uploads
+
+    _, first = upload("people.csv", b"name\nAnn\n")
+    status_code, second = upload("copy.csv", b"name\nAnn\n")
+
+    assert status_code == 200
+    assert second["duplicate"] is True
+    assert second["file"]["file_id"] == first["file"]["file_id"]
+    assert second["file"]["status"] == "pending"
+    assert queued == [first["file"]["file_id"]]  # ingested once
+    assert len(list(folder.iterdir())) == 1  # second copy not kept
+
+
+def test_failed_or_different_content_is_uploaded_again(uploads):
+    db_path, folder, queued = uploads
+
+    _, first = upload("people.csv", b"name\nAnn\n")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(app.SQL_FILE_FAILED, (first["file"]["file_id"],))
+
+    _, retry = upload("people.csv", b"name\nAnn\n")
+    _, other = upload("other.csv", b"name\nBo\n")
+
+    assert "duplicate" not in retry and "duplicate" not in other
+    assert len(queued) == 3
+
+
+def test_double_submit_keeps_the_saved_file(uploads):
+    db_path, folder, queued = uploads
+
+    _, first = upload("people.csv", b"name\nAnn\n")
+    _, again = upload("people.csv", b"name\nAnn\n")  # same stored name if within a second
+
+    assert again["file"]["file_id"] == first["file"]["file_id"]
+    assert (folder / first["file"]["filename"]).exists()
@@ -122,9 +122,11 @@ export default function FilesPage() {
                     <div className="flex items-center gap-3 text-sm text-muted-foreground mt-1">
                       <span className="px-2 py-0.5 rounded-md bg-secondary">{file.file_type.toUpperCase()}</span>
                       <span>{formatFileSize(file.file_size)}</span>
-                      {file.num_rows > 0 && <span>{file.num_rows.toLocaleString()} rows</span>}
-                      {file.num_columns > 0 && <span>{file.num_columns} columns</span>}
-                      <span className="text-xs">{file.num_chunks} chunks</span>
+                      {file.status === 'pending' && <span>Processing...</span>}
+                      {file.status === 'failed' && <span className="text-destructive">Processing failed</span>}
+                      {!!file.num_rows && <span>{file.num_rows.toLocaleString()} rows</span>}
+                      {!!file.num_columns && <span>{file.num_columns} columns</span>}
+                      {file.status === 'ready' && <span className="text-xs">{file.num_chunks} chunks</span>}
                     </div>
                   </div>
                 </div>
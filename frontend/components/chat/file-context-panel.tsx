@@ -101,12 +101,12 @@ export function FileContextPanel({ selectedFileId }: FileContextPanelProps) {
                   <div className="flex items-center gap-2">
                     <Hash className="w-4 h-4 text-muted-foreground" />
                     <span className="text-muted-foreground">Rows:</span>
-                    <span className="font-medium">{fileInfo.num_rows.toLocaleString()}</span>
+                    <span className="font-medium">{(fileInfo.num_rows ?? 0).toLocaleString()}</span>
                   </div>
                   <div className="flex items-center gap-2">
                     <Columns className="w-4 h-4 text-muted-foreground" />
                     <span className="text-muted-foreground">Cols:</span>
-                    <span className="font-medium">{fileInfo.num_columns}</span>
+                    <span className="font-medium">{fileInfo.num_columns ?? 0}</span>
                   </div>
                   <div className="flex items-center gap-2 col-span-2">
                     <Calendar className="w-4 h-4 text-muted-foreground" />
@@ -125,7 +125,7 @@ export function FileContextPanel({ selectedFileId }: FileContextPanelProps) {
               <div className="p-4 rounded-xl bg-gradient-to-br from-emerald-500/10 to-blue-500/10 border border-emerald-500/20">
                 <p className="text-sm font-medium mb-2">Data Summary</p>
                 <div className="space-y-1 text-sm text-muted-foreground">
-                  <p>Total Chunks: {fileInfo.num_chunks}</p>
+                  <p>Total Chunks: {fileInfo.num_chunks ?? 0}</p>
                   <p>Collection: {fileInfo.collection_name}</p>
                   <p>Uploaded: {new Date(fileInfo.upload_date).toLocaleDateString()}</p>
                 </div>
@@ -96,6 +96,9 @@ export function FileDropzone() {
         return "text/csv"
       case "json":
         return "application/json"
+      case "jsonl":
+      case "ndjson":
+        return "application/x-ndjson"
       case "pdf":
         return "application/pdf"
       case "ics":
@@ -134,28 +137,40 @@ export function FileDropzone() {
         })
       }, 200)
 
-      // Upload file to backend
+      // Upload file to backend (answers 202 - ingest runs in the background)
       const response = await api.files.upload(selectedFile)
 
       clearInterval(progressInterval)
       setUploadProgress(100)
 
       if (response.success) {
-        setIsProcessed(true)
         setUploadedFileId(response.file.file_id)
-        
+
+        toast({
+          title: response.duplicate ? "File already uploaded" : "File uploaded",
+          description: `Processing ${response.file.original_filename}...`,
+        })
+
+        // Wait for the ingest to finish
+        const processed = await api.files.waitUntilProcessed(response.file.file_id)
+        if (processed.status === 'failed') {
+          throw new Error(`Failed to process ${processed.original_filename}`)
+        }
+
+        setIsProcessed(true)
+
         // Update file info with backend response
         if (file) {
           setFile({
             ...file,
-            rows: response.file.num_rows,
-            columns: response.file.num_columns,
+            rows: processed.num_rows ?? undefined,
+            columns: processed.num_columns ?? undefined,
           })
         }
 
         toast({
-          title: "File uploaded successfully!",
-          description: `Processed ${response.file.num_chunks} chunks from ${response.file.original_filename}`,
+          title: "File processed successfully!",
+          description: `Processed ${processed.num_chunks} chunks from ${processed.original_filename}`,
         })
       }
     } catch (err: any) {
@@ -205,7 +220,7 @@ export function FileDropzone() {
       >
         <input
           type="file"
-          accept=".csv,.json,.pdf,.ics"
+          accept=".csv,.json,.jsonl,.ndjson,.pdf,.ics"
           onChange={handleFileSelect}
           className="absolute inset-0 w-full h-full opacity-0 cursor-pointer z-10"
         />
@@ -364,7 +379,9 @@ export function FileDropzone() {
                     <div>
                       <p className="font-medium">{item.original_filename}</p>
                       <p className="text-xs text-muted-foreground">
-                        {item.num_rows} rows × {item.num_columns} columns
+                        {item.status === 'ready'
+                          ? `${item.num_rows} rows × ${item.num_columns} columns`
+                          : item.status === 'failed' ? 'Processing failed' : 'Processing...'}
                       </p>
                     </div>
                   </div>
@@ -24,17 +24,21 @@ export interface RegisterData {
   password: string;
 }
 
+export type FileStatus = 'pending' | 'ready' | 'failed';
+
 export interface FileInfo {
   file_id: number;
   filename: string;
   original_filename: string;
   file_type: string;
   upload_date: string;
-  num_rows: number;
-  num_columns: number;
+  status: FileStatus;
+  // Counts are filled in once ingest finishes (null while 'pending')
+  num_rows: number | null;
+  num_columns: number | null;
   file_size: number;
   collection_name: string;
-  num_chunks: number;
+  num_chunks: number | null;
 }
 
 export interface ChatMessage {
@@ -47,7 +51,6 @@ export interface ChatMessage {
 
 export interface AskResponse {
   success: boolean;
-  chat_id: number;
   question: string;
   answer: string;
   num_chunks_used: number;
@@ -129,8 +132,11 @@ export const authApi = {
 export const filesApi = {
   /**
    * Upload a file
+   * The backend answers 202 with status 'pending' - use waitUntilProcessed()
+   * to wait for the ingest to finish. Content the user already uploaded
+   * answers 200 with duplicate: true and the existing file
    */
-  upload: async (file: File): Promise<{ success: boolean; file: FileInfo }> => {
+  upload: async (file: File): Promise<{ success: boolean; message: string; duplicate?: boolean; file: FileInfo }> => {
     const formData = new FormData();
     formData.append('file', file);
 
@@ -165,6 +171,24 @@ export const filesApi = {
     return handleResponse(response);
   },
 
+  /**
+   * Poll a file until its ingest is 'ready' or 'failed'
+   */
+  waitUntilProcessed: async (
+    id: number,
+    { intervalMs = 1500, timeoutMs = 10 * 60 * 1000 }: { intervalMs?: number; timeoutMs?: number } = {}
+  ): Promise<FileInfo> => {
+    const deadline = Date.now() + timeoutMs;
+    while (true) {
+      const { file } = await filesApi.get(id);
+      if (file.status !== 'pending') return file;
+      if (Date.now() >= deadline) {
+        throw new ApiError(408, 'Timed out waiting for the file to be processed');
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  },
+
   /**
    * Delete a file
    */